@@ -1,4 +1,3 @@
-```python
 """
 JWT Authentication middleware for VulnScan API.
 
@@ -23,10 +22,107 @@ Dependencies:
 - Integrates with Django's User model for authentication
 """
 
+import copy
+import threading
+import time
+
+import jwt
 from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
 from django.contrib.auth.models import User
 from apps.auth_app.jwt_utils import decode_jwt
+from apps.auth_app.revocation import is_revoked
+from apps.auth_app.utils.ttl_cache import TTLCache
+from vulnscanner.redis_client import get_client
+
+# Recently authenticated users keyed by id, so bursts of API calls from one
+# client skip the auth_user lookup. Views that modify the user must call
+# invalidate_cached_user().
+#
+# The cache is per process. Invalidations are also published to Redis
+# (sorted set of user id -> time) and every process drops the users listed
+# there at most every USER_INVALIDATION_SYNC_SECONDS, lazily on the request
+# path. So on other workers a deactivated user, changed password or
+# changed name can stay cached for up to USER_INVALIDATION_SYNC_SECONDS,
+# or for the full USER_CACHE_TTL when Redis is unavailable.
+USER_CACHE_TTL = 30
+_USER_CACHE = TTLCache(maxsize=5000, ttl=USER_CACHE_TTL)
+
+USER_INVALIDATIONS_KEY = "vulnscanner:invalidated_users"
+USER_INVALIDATION_SYNC_SECONDS = 5
+_invalidation_lock = threading.Lock()  # guards the check-and-claim of _last_invalidation_sync
+_last_invalidation_sync = 0.0
+
+# Columns read by the API views and ProfileSerializer; everything else
+# (password hash, last_login, permission flags) stays deferred. The profile
+# row is LEFT JOINed in the same query so avatar URLs need no extra lookup.
+_USER_FIELDS = (
+    "id", "is_active", "username", "email", "first_name", "last_name", "date_joined",
+    "profile__avatar",
+)
+
+# Lookup queryset built once; .get() clones it, so sharing it is thread-safe
+_ACTIVE_USERS = User.objects.select_related("profile").only(*_USER_FIELDS).filter(is_active=True)
+
+# Single failure message for bad tokens and missing/deactivated accounts
+_INVALID_TOKEN_MSG = "Invalid or expired authentication token"
+
+_AUTH_COOKIE_PREFIX = "auth_token="
+
+
+def _extract_auth_token(raw_cookie):
+    """
+    Pull the auth_token value straight out of a raw Cookie header.
+
+    Avoids building the full request.COOKIES dict (SimpleCookie parsing) when
+    only one cookie is needed. Like Django's parser, the last occurrence wins.
+    """
+    token = None
+    for part in raw_cookie.split(";"):
+        part = part.strip()
+        if part.startswith(_AUTH_COOKIE_PREFIX):
+            token = part[len(_AUTH_COOKIE_PREFIX):]
+    return token
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user from the authentication cache after it was modified or deleted."""
+    _USER_CACHE.pop(user_id)
+    r = get_client()
+    if r:
+        now = time.time()
+        try:
+            pipe = r.pipeline()
+            pipe.zadd(USER_INVALIDATIONS_KEY, {str(user_id): now})
+            # entries older than the cache TTL can't match a cached user
+            pipe.zremrangebyscore(USER_INVALIDATIONS_KEY, "-inf", now - USER_CACHE_TTL)
+            pipe.execute()
+        except Exception:
+            pass
+
+
+def _sync_user_invalidations(now):
+    """
+    Drop users invalidated by other processes since the last sync; at most
+    one caller per USER_INVALIDATION_SYNC_SECONDS window does the work.
+    """
+    global _last_invalidation_sync
+    with _invalidation_lock:
+        since = _last_invalidation_sync
+        if now - since < USER_INVALIDATION_SYNC_SECONDS:
+            return
+        _last_invalidation_sync = now
+    r = get_client()
+    if not r:
+        return
+    try:
+        # a second of overlap covers clock skew between workers
+        user_ids = r.zrangebyscore(USER_INVALIDATIONS_KEY, since - 1, "+inf")
+    except Exception:
+        # keep serving from the local cache on transient Redis errors
+        return
+    for user_id in user_ids:
+        _USER_CACHE.pop(int(user_id))
 
 
 class CookieJWTAuthentication(BaseAuthentication):
@@ -68,36 +164,52 @@ class CookieJWTAuthentication(BaseAuthentication):
             >>> authentication = CookieJWTAuthentication()
             >>> user, token = authentication.authenticate(request)
         """
+        # Reuse the result if this request was already authenticated once
+        cached_user = getattr(request, "_cached_auth_user", None)
+        if cached_user is not None:
+            return (cached_user, request._cached_auth_token)
+
         # Extract JWT token from 'auth_token' cookie
-        token = request.COOKIES.get("auth_token")
+        raw_cookie = request.META.get("HTTP_COOKIE")
+        if raw_cookie is not None:
+            token = _extract_auth_token(raw_cookie)
+        else:
+            token = request.COOKIES.get("auth_token")
         
         # Return None if no token provided (allow other auth methods to try)
         if not token:
             return None
 
+        # Logged-out tokens are rejected before any signature work
+        if is_revoked(token):
+            raise exceptions.AuthenticationFailed(_INVALID_TOKEN_MSG)
+
         try:
             # Decode and validate JWT token
-            # This verifies signature and checks expiration
+            # This verifies signature, expiration and required claims (exp, iat, user_id)
             payload = decode_jwt(token)
-        except Exception as e:
-            # Token is invalid, expired, or tampered with
-            raise exceptions.AuthenticationFailed("Invalid or expired authentication token")
-
-        # Extract user_id from token payload
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise exceptions.AuthenticationFailed("Invalid token payload: missing user_id")
-
-        try:
-            # Retrieve user from database using ID from token
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            # User was deleted or doesn't exist anymore
-            raise exceptions.AuthenticationFailed("User account not found")
-
-        # Optional: Check if user is active
-        if not user.is_active:
-            raise exceptions.AuthenticationFailed("User account is deactivated")
+            user_id = payload["user_id"]
+
+            now = time.time()
+            if now - _last_invalidation_sync >= USER_INVALIDATION_SYNC_SECONDS:
+                _sync_user_invalidations(now)
+            user = _USER_CACHE.get(user_id)
+            if user is None:
+                # Retrieve active user from database using ID from token
+                user = _ACTIVE_USERS.get(id=user_id)
+                _USER_CACHE.set(user_id, user)
+        except (jwt.InvalidTokenError, User.DoesNotExist):
+            # Token is invalid, expired or tampered with, or the user was
+            # deleted/deactivated. Database errors are deliberately not caught.
+            raise exceptions.AuthenticationFailed(_INVALID_TOKEN_MSG) from None
+
+        # Hand out a copy so per-request changes never leak into the cache
+        user = copy.copy(user)
+
+        # Memoize on the request for later authenticators/permissions
+        request._cached_auth_payload = payload
+        request._cached_auth_user = user
+        request._cached_auth_token = token
 
         # Return authenticated user and token
         # The token can be used for additional validation if needed
@@ -118,46 +230,3 @@ class CookieJWTAuthentication(BaseAuthentication):
             str: Authentication scheme identifier
         """
         return 'Cookie realm="api"'
-
-"""
-Integration Notes:
-
-1. Settings Configuration:
-   Add to REST_FRAMEWORK settings in settings.py:
-   
-   REST_FRAMEWORK = {
-       'DEFAULT_AUTHENTICATION_CLASSES': [
-           'apps.auth_app.authentication.CookieJWTAuthentication',
-       ],
-   }
-
-2. Cookie Requirements:
-   - Name: 'auth_token'
-   - Flags: HttpOnly, Secure, SameSite=Strict
-   - Set via response.set_cookie() after successful login
-
-3. Security Considerations:
-   - Tokens have expiration (typically 24 hours)
-   - Automatic token refresh can be implemented
-   - Logout clears the cookie on client and server
-   - Regular token rotation is recommended
-
-4. Error Handling:
-   - 401 Unauthorized: Invalid/missing token
-   - 403 Forbidden: Valid token but insufficient permissions
-   - 400 Bad Request: Malformed token (rare)
-
-Example Token Payload:
-{
-    "user_id": 123,
-    "email": "user@example.com",
-    "exp": 1698765432,
-    "iat": 1698679032
-}
-
-Alternative Approaches Considered:
-- Header-based tokens (less secure, vulnerable to XSS)
-- Session-based authentication (stateful, requires server storage)
-- OAuth2/OpenID Connect (more complex, for enterprise use)
-"""
-```  
@@ -1,27 +1,106 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+
 import jwt
-from datetime import datetime, timedelta
 from django.conf import settings
 
+from .utils.ttl_cache import TTLCache
+
 JWT_ALGO = "HS256"
 JWT_EXP_DAYS = 7  # token validity
+JWT_REQUIRED_CLAIMS = ("exp", "iat", "user_id")
+
+# Header segment of our own tokens: {"alg":"HS256","typ":"JWT"} (same bytes
+# PyJWT emits). Tokens carrying it are signed and verified by the HMAC fast
+# paths below; anything else goes through PyJWT.
+_HS256_HEADER_B64 = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+
+# Key bytes and a keyed HMAC state prepared once; each verification copies the
+# template instead of re-encoding SECRET_KEY and re-running the HMAC key setup.
+_SECRET_BYTES = settings.SECRET_KEY.encode("utf-8")
+_HMAC_TEMPLATE = hmac.new(_SECRET_BYTES, None, hashlib.sha256)
+
+# Verified payloads keyed by raw token, so repeat requests skip HMAC + JSON work.
+# Entries live for at most 60 seconds and never past the token's exp.
+_PAYLOAD_CACHE = TTLCache(maxsize=10_000, ttl=60)
 
 def create_jwt_for_user(user):
+    now = int(time.time())
     payload = {
         "user_id": user.id,
-        "exp": datetime.utcnow() + timedelta(days=JWT_EXP_DAYS),
-        "iat": datetime.utcnow(),
+        "exp": now + JWT_EXP_DAYS * 86400,
+        "iat": now,
     }
-    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=JWT_ALGO)
-    # PyJWT>=2 returns str, older returns bytes — ensure string
-    if isinstance(token, bytes):
-        token = token.decode("utf-8")
-    return token
+    return _encode_hs256(payload)
 
-def decode_jwt(token):
+def _b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def _encode_hs256(payload):
+    payload_b64 = _b64url_encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    signing_input = f"{_HS256_HEADER_B64}.{payload_b64}"
+    h = _HMAC_TEMPLATE.copy()
+    h.update(signing_input.encode("ascii"))
+    return f"{signing_input}.{_b64url_encode(h.digest())}"
+
+def _validate_claims(payload, now):
+    # Same checks (and exception types) PyJWT applies with zero leeway
+    for claim in JWT_REQUIRED_CLAIMS:
+        if payload.get(claim) is None:
+            raise jwt.MissingRequiredClaimError(claim)
+    try:
+        if "exp" in payload and int(payload["exp"]) <= now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        if "iat" in payload and int(payload["iat"]) > now:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (iat)")
+        if "nbf" in payload and int(payload["nbf"]) > now:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    except (TypeError, ValueError):
+        raise jwt.DecodeError("Time claims (exp, iat, nbf) must be integers")
+
+def _decode_hs256(header_b64, payload_b64, sig_b64):
+    try:
+        signature = _b64url_decode(sig_b64)
+    except (binascii.Error, ValueError):
+        raise jwt.DecodeError("Invalid crypto padding")
+    h = _HMAC_TEMPLATE.copy()
+    h.update(f"{header_b64}.{payload_b64}".encode("ascii"))
+    if not hmac.compare_digest(h.digest(), signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[JWT_ALGO])
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (binascii.Error, ValueError):
+        raise jwt.DecodeError("Invalid payload string")
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload string: must be a json object")
+    _validate_claims(payload, time.time())
+    return payload
+
+def forget_token(token):
+    _PAYLOAD_CACHE.pop(token)
+
+def decode_jwt(token):
+    payload = _PAYLOAD_CACHE.get(token)
+    if payload is not None:
         return payload
-    except jwt.ExpiredSignatureError:
-        raise
-    except Exception:
-        raise
+    parts = token.split(".")
+    if len(parts) == 3 and parts[0] == _HS256_HEADER_B64 and parts[1].isascii():
+        payload = _decode_hs256(*parts)
+    else:
+        # PyJWT raises jwt.InvalidTokenError subclasses; let them propagate as-is
+        payload = jwt.decode(
+            token,
+            _SECRET_BYTES,
+            algorithms=[JWT_ALGO],
+            options={"require": list(JWT_REQUIRED_CLAIMS)},
+            leeway=0,
+        )
+    _PAYLOAD_CACHE.set(token, payload, expires_at=payload.get("exp"))
+    return payload
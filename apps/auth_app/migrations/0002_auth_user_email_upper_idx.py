@@ -0,0 +1,21 @@
+# Functional index backing RegisterSerializer's case-insensitive email check.
+# On PostgreSQL, Django compiles email__iexact to UPPER("email"::text) = UPPER(%s),
+# so the index is built on exactly that expression. auth.User belongs to
+# django.contrib.auth, hence raw SQL instead of Meta.indexes.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_upper_idx ON auth_user (UPPER("email"::text));',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_upper_idx;',
+        ),
+    ]
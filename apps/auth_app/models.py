@@ -16,7 +16,7 @@ Security Considerations:
 - User authentication relies on Django's secure User model
 """
 
-from pathlib import Path
+import os
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -34,7 +34,7 @@ def avatar_upload_to(instance, filename):
     Example: avatars/42/avatar.jpg
     """
     # Extract file extension from original filename
-    file_extension = Path(filename).suffix.lower()
+    file_extension = os.path.splitext(filename)[1].lower()
     
     # Generate structured path: avatars/{user_id}/avatar{extension}
     return f"avatars/{instance.user_id}/avatar{file_extension}"
@@ -0,0 +1,89 @@
+"""
+Revocation list for logged-out authentication tokens.
+
+JWTs stay valid until they expire, so logging out only cleared the cookie.
+Revoked tokens are now recorded as truncated SHA-256 fingerprints:
+
+- locally in a process-wide dict (fingerprint -> token exp), checked on every
+  request with a single dict lookup before any JWT verification
+- in Redis (sorted set scored by exp) when available, so revocations made by
+  one worker reach the others; each process re-syncs at most every
+  REVOCATION_SYNC_SECONDS, lazily on the request path
+
+Entries are dropped once the token they describe has expired.
+"""
+
+import hashlib
+import threading
+import time
+
+from apps.auth_app.jwt_utils import forget_token
+from vulnscanner.redis_client import get_client
+
+REVOKED_TOKENS_KEY = "vulnscanner:revoked_tokens"
+REVOCATION_SYNC_SECONDS = 10
+
+_revoked: dict[bytes, float] = {}  # fingerprint -> token exp timestamp
+_lock = threading.Lock()
+_last_sync = 0.0
+_sync_lock = threading.Lock()  # guards the check-and-claim of _last_sync
+
+
+def _fingerprint(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()[:8]
+
+
+def _claim_sync(now: float) -> bool:
+    """
+    True for exactly one caller per REVOCATION_SYNC_SECONDS window: checks
+    and advances _last_sync atomically, so concurrent requests don't all
+    run the same sync.
+    """
+    global _last_sync
+    with _sync_lock:
+        if now - _last_sync < REVOCATION_SYNC_SECONDS:
+            return False
+        _last_sync = now
+        return True
+
+
+def _sync_from_redis(now: float) -> None:
+    r = get_client()
+    if not r:
+        return
+    try:
+        pipe = r.pipeline()
+        pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", now)
+        pipe.zrange(REVOKED_TOKENS_KEY, 0, -1, withscores=True)
+        _, members = pipe.execute()
+    except Exception:
+        # keep serving from the local list on transient Redis errors
+        return
+    fresh = {bytes.fromhex(member): score for member, score in members}
+    with _lock:
+        for fp, exp in list(_revoked.items()):
+            if exp <= now:
+                del _revoked[fp]
+        _revoked.update(fresh)
+
+
+def revoke_token(token: str, expires_at: float) -> None:
+    """Reject this token from now on, until its own expiry time."""
+    fp = _fingerprint(token)
+    with _lock:
+        _revoked[fp] = expires_at
+    forget_token(token)
+    r = get_client()
+    if r:
+        try:
+            r.zadd(REVOKED_TOKENS_KEY, {fp.hex(): expires_at})
+        except Exception:
+            pass
+
+
+def is_revoked(token: str) -> bool:
+    now = time.time()
+    if now - _last_sync >= REVOCATION_SYNC_SECONDS and _claim_sync(now):
+        _sync_from_redis(now)
+    exp = _revoked.get(_fingerprint(token))
+    return exp is not None and exp > now
@@ -1,4 +1,3 @@
-```python
 """
 Serializers for VulnScan authentication application.
 
@@ -22,7 +21,6 @@ Key Features:
 """
 
 from django.contrib.auth.models import User
-from django.utils import timezone
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
@@ -141,69 +139,45 @@ class LoginSerializer(serializers.Serializer):
 # PROFILE SERIALIZERS
 # =============================================================================
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(serializers.Serializer):
     """
     Serializer for reading user profile data with formatted output.
     
     Provides user profile information in camelCase format for frontend
     consumption, including generated user ID and avatar URL.
     
+    Output is built directly in to_representation() rather than through
+    DRF's per-field machinery, so there are no declared fields; the list
+    below is the schema.
+    
     Fields:
     - userId: Generated user identifier (u_{id})
     - email: User's email address
     - firstName: User's first name (camelCase)
     - lastName: User's last name (camelCase)
-    - createdAt: Account creation timestamp (ISO format)
+    - createdAt: Account creation timestamp (ISO 8601, datetime.isoformat())
     - avatarUrl: Absolute URL to user's avatar image
     """
-    
-    userId = serializers.SerializerMethodField(
-        help_text="Unique user identifier in format u_{id}"
-    )
-    firstName = serializers.CharField(
-        source="first_name",
-        help_text="User's first name"
-    )
-    lastName = serializers.CharField(
-        source="last_name",
-        help_text="User's last name"
-    )
-    createdAt = serializers.SerializerMethodField(
-        help_text="Account creation timestamp in ISO 8601 format"
-    )
-    avatarUrl = serializers.SerializerMethodField(
-        help_text="Absolute URL to user's profile picture"
-    )
-
-    class Meta:
-        model = User
-        fields = ("userId", "email", "firstName", "lastName", "createdAt", "avatarUrl")
-
-    def get_userId(self, obj):
-        """
-        Generate formatted user ID for frontend consumption.
-        
-        Args:
-            obj (User): User instance
-            
-        Returns:
-            str: Formatted user ID (e.g., "u_42")
-        """
-        return f"u_{obj.id}"
 
-    def get_createdAt(self, obj):
+    def to_representation(self, obj):
         """
-        Get account creation timestamp in ISO format.
+        Build the profile payload in a single dict literal.
         
         Args:
             obj (User): User instance
             
         Returns:
-            str: ISO 8601 formatted timestamp
+            dict: Profile data with formatted user ID (e.g., "u_42")
+                  and ISO 8601 creation timestamp
         """
-        return (obj.date_joined.isoformat()
-                if hasattr(obj, "date_joined")
-                else timezone.now().isoformat())
+        return {
+            "userId": f"u_{obj.id}",
+            "email": obj.email,
+            "firstName": obj.first_name,
+            "lastName": obj.last_name,
+            "createdAt": obj.date_joined.isoformat(),
+            "avatarUrl": self.get_avatarUrl(obj),
+        }
 
     def get_avatarUrl(self, obj):
         """
@@ -480,4 +454,3 @@ Testing Recommendations:
 - Test file upload validation with various file types
 - Verify password validation with weak passwords
 """
-```
@@ -1,3 +1,282 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework import exceptions
+
+from apps.auth_app import authentication, jwt_utils, revocation
+from apps.auth_app.authentication import (
+    CookieJWTAuthentication,
+    _extract_auth_token,
+    invalidate_cached_user,
+)
+from apps.auth_app.serializers import ProfileSerializer
+from apps.auth_app.utils.ttl_cache import TTLCache
+
+
+def _pyjwt_decode(token):
+    """Reference decode: what decode_jwt() replaced."""
+    return jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[jwt_utils.JWT_ALGO],
+        options={"require": list(jwt_utils.JWT_REQUIRED_CLAIMS)},
+        leeway=0,
+    )
+
+
+class HS256CompatibilityTests(SimpleTestCase):
+    """The hand-rolled HS256 path must behave exactly like PyJWT."""
+
+    def _payload(self, **overrides):
+        now = int(time.time())
+        payload = {"user_id": 7, "exp": now + 3600, "iat": now}
+        payload.update(overrides)
+        return {k: v for k, v in payload.items() if v is not None}
+
+    def _pyjwt_token(self, payload):
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=jwt_utils.JWT_ALGO)
+
+    def assertBothReject(self, token, exc_type):
+        with self.assertRaises(exc_type):
+            _pyjwt_decode(token)
+        with self.assertRaises(exc_type):
+            jwt_utils.decode_jwt(token)
+
+    def test_encode_matches_pyjwt(self):
+        payload = self._payload()
+        self.assertEqual(jwt_utils._encode_hs256(payload), self._pyjwt_token(payload))
+
+    def test_created_token_decodes_with_pyjwt(self):
+        user = type("U", (), {"id": 42})()
+        token = jwt_utils.create_jwt_for_user(user)
+        self.assertEqual(_pyjwt_decode(token)["user_id"], 42)
+        self.assertEqual(jwt_utils.decode_jwt(token), _pyjwt_decode(token))
+
+    def test_valid_pyjwt_token_decodes(self):
+        token = self._pyjwt_token(self._payload(user_id=9))
+        self.assertEqual(jwt_utils.decode_jwt(token), _pyjwt_decode(token))
+
+    def test_expired_token(self):
+        now = int(time.time())
+        token = self._pyjwt_token(self._payload(exp=now - 1, iat=now - 10))
+        self.assertBothReject(token, jwt.ExpiredSignatureError)
+
+    def test_token_issued_in_the_future(self):
+        token = self._pyjwt_token(self._payload(iat=int(time.time()) + 600))
+        self.assertBothReject(token, jwt.ImmatureSignatureError)
+
+    def test_token_not_yet_valid(self):
+        token = self._pyjwt_token(self._payload(nbf=int(time.time()) + 600))
+        self.assertBothReject(token, jwt.ImmatureSignatureError)
+
+    def test_bad_signature(self):
+        token = jwt.encode(self._payload(), "another-secret", algorithm=jwt_utils.JWT_ALGO)
+        self.assertBothReject(token, jwt.InvalidSignatureError)
+
+    def test_tampered_payload(self):
+        header, _, sig = self._pyjwt_token(self._payload(user_id=1)).split(".")
+        forged = self._pyjwt_token(self._payload(user_id=2)).split(".")[1]
+        self.assertBothReject(f"{header}.{forged}.{sig}", jwt.InvalidSignatureError)
+
+    def test_missing_required_claims(self):
+        for claim in jwt_utils.JWT_REQUIRED_CLAIMS:
+            with self.subTest(claim=claim):
+                token = self._pyjwt_token(self._payload(**{claim: None}))
+                self.assertBothReject(token, jwt.MissingRequiredClaimError)
+
+    def test_malformed_token(self):
+        with self.assertRaises(jwt.InvalidTokenError):
+            jwt_utils.decode_jwt("not-a-token")
+        header = jwt_utils._HS256_HEADER_B64
+        with self.assertRaises(jwt.InvalidTokenError):
+            jwt_utils.decode_jwt(f"{header}.e30.!!!")
+
+
+class PayloadCacheTests(SimpleTestCase):
+
+    def test_verified_payload_reused_until_forgotten(self):
+        token = jwt_utils.create_jwt_for_user(type("U", (), {"id": 5})())
+        payload = jwt_utils.decode_jwt(token)
+        self.addCleanup(jwt_utils.forget_token, token)
+
+        with mock.patch.object(jwt_utils, "_decode_hs256", side_effect=AssertionError("re-verified")):
+            self.assertEqual(jwt_utils.decode_jwt(token), payload)
+            jwt_utils.forget_token(token)
+            with self.assertRaises(AssertionError):
+                jwt_utils.decode_jwt(token)
+
+    def test_invalid_token_not_cached(self):
+        token = jwt.encode(
+            {"user_id": 5, "exp": int(time.time()) + 60, "iat": int(time.time())},
+            "another-secret", algorithm=jwt_utils.JWT_ALGO,
+        )
+        for _ in range(2):
+            with self.assertRaises(jwt.InvalidSignatureError):
+                jwt_utils.decode_jwt(token)
+
+
+class AuthenticationTestCase(TestCase):
+    """Runs CookieJWTAuthentication against real users, with a cold user cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="pw", first_name="Alice")
+
+    def setUp(self):
+        authentication._USER_CACHE._data.clear()
+        self.addCleanup(authentication._USER_CACHE._data.clear)
+        self.token = jwt_utils.create_jwt_for_user(self.user)
+        self.addCleanup(jwt_utils.forget_token, self.token)
+
+    def _authenticate(self, token=None, **extra):
+        if token is None:
+            token = self.token
+        request = RequestFactory().get("/", HTTP_COOKIE=f"auth_token={token}", **extra)
+        return CookieJWTAuthentication().authenticate(request)
+
+
+class UserCacheTests(AuthenticationTestCase):
+
+    def test_cached_user_skips_the_query(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            user, token = self._authenticate()
+        self.assertEqual((user.id, token), (self.user.id, self.token))
+
+    def test_callers_get_a_copy(self):
+        user, _ = self._authenticate()
+        user.first_name = "Mallory"
+        user, _ = self._authenticate()
+        self.assertEqual(user.first_name, "Alice")
+
+    def test_invalidation_reloads_the_user(self):
+        self._authenticate()
+        User.objects.filter(id=self.user.id).update(first_name="Alicia")
+        self.assertEqual(self._authenticate()[0].first_name, "Alice")  # still cached
+
+        invalidate_cached_user(self.user.id)
+        self.assertEqual(self._authenticate()[0].first_name, "Alicia")
+
+    def test_invalidation_published_to_redis(self):
+        client = mock.MagicMock()
+        with mock.patch.object(authentication, "get_client", return_value=client):
+            invalidate_cached_user(self.user.id)
+        client.pipeline.return_value.zadd.assert_called_once()
+        key, members = client.pipeline.return_value.zadd.call_args.args
+        self.assertEqual((key, list(members)), (authentication.USER_INVALIDATIONS_KEY, [str(self.user.id)]))
+
+    def test_invalidations_from_other_workers_applied(self):
+        self._authenticate()
+        client = mock.MagicMock()
+        client.zrangebyscore.return_value = [str(self.user.id)]
+        later = time.time() + 3600  # past any window claimed by other tests
+        with mock.patch.object(authentication, "get_client", return_value=client):
+            authentication._sync_user_invalidations(later)
+            # within the same window nothing is fetched again
+            authentication._sync_user_invalidations(later + 1)
+        client.zrangebyscore.assert_called_once()
+        self.assertIsNone(authentication._USER_CACHE.get(self.user.id))
+
+
+class TTLCacheTests(SimpleTestCase):
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, expires_at=time.time() - 1)  # already expired: not stored
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_oldest_entry_evicted_when_full(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.get("b"), cache.get("c")), (2, 3))
+
+
+class InactiveUserTests(AuthenticationTestCase):
+
+    def test_inactive_user_rejected(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate()
+
+    def test_deleted_user_rejected(self):
+        token = jwt_utils.create_jwt_for_user(type("U", (), {"id": 999999})())
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate(token)
+
+
+class AuthCookieTests(AuthenticationTestCase):
+
+    def test_extract_auth_token(self):
+        self.assertEqual(_extract_auth_token("a=1; auth_token=xyz; b=2"), "xyz")
+        self.assertEqual(_extract_auth_token("auth_token=old;auth_token=new"), "new")
+        self.assertIsNone(_extract_auth_token("other_auth_token=x; a=1"))
+
+    def test_no_cookie_means_no_credentials(self):
+        request = RequestFactory().get("/")
+        self.assertIsNone(CookieJWTAuthentication().authenticate(request))
+
+    def test_falls_back_to_parsed_cookies(self):
+        request = RequestFactory().get("/")
+        del request.META["HTTP_COOKIE"]
+        request.COOKIES = {"auth_token": self.token}
+        user, _ = CookieJWTAuthentication().authenticate(request)
+        self.assertEqual(user.id, self.user.id)
+
+    def test_result_memoized_on_the_request(self):
+        request = RequestFactory().get("/", HTTP_COOKIE=f"auth_token={self.token}")
+        first = CookieJWTAuthentication().authenticate(request)
+        with mock.patch.object(authentication, "decode_jwt", side_effect=AssertionError):
+            self.assertEqual(CookieJWTAuthentication().authenticate(request), first)
+
+
+class RevocationTests(SimpleTestCase):
+
+    def test_revoked_token_is_rejected_until_expiry(self):
+        now = time.time()
+        revocation.revoke_token("token-a", now + 60)
+        revocation.revoke_token("token-b", now - 1)
+        self.assertTrue(revocation.is_revoked("token-a"))
+        self.assertFalse(revocation.is_revoked("token-b"))
+        self.assertFalse(revocation.is_revoked("token-c"))
+
+    def test_sync_is_claimed_once_per_window(self):
+        now = time.time() + 3600  # past any window claimed by other tests
+        self.assertTrue(revocation._claim_sync(now))
+        self.assertFalse(revocation._claim_sync(now + 1))
+        self.assertTrue(revocation._claim_sync(now + revocation.REVOCATION_SYNC_SECONDS))
+
+
+class RevokedTokenAuthenticationTests(AuthenticationTestCase):
+
+    def test_revoked_token_rejected(self):
+        self._authenticate()
+        revocation.revoke_token(self.token, time.time() + 60)
+        # tokens minted in the same second are identical: un-revoke afterwards
+        self.addCleanup(revocation._revoked.pop, revocation._fingerprint(self.token), None)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate()
+
+
+class ProfileSerializerTests(TestCase):
+
+    def test_profile_payload(self):
+        user = User.objects.create_user(
+            "alice", email="alice@example.com", password="pw", first_name="Alice", last_name="Liddell",
+        )
+        self.assertEqual(ProfileSerializer(user).data, {
+            "userId": f"u_{user.id}",
+            "email": "alice@example.com",
+            "firstName": "Alice",
+            "lastName": "Liddell",
+            "createdAt": user.date_joined.isoformat(),
+            "avatarUrl": None,
+        })
@@ -26,42 +26,44 @@ from .views import (
 )
 
 # Authentication application URL patterns
+# Ordered by expected request volume: Django's resolver tries patterns in
+# order and stops at the first match, so the hottest routes come first.
 urlpatterns = [
     # =========================================================================
     # AUTHENTICATION ENDPOINTS
     # =========================================================================
     
-    # User registration - creates new account and returns JWT token
-    path("register", RegisterView.as_view(), name="register"),
-    
     # User authentication - validates credentials and sets JWT cookie
     path("login", LoginView.as_view(), name="login"),
     
+    # Profile retrieval - gets current user's profile information
+    path("profile", ProfileView.as_view(), name="profile"),
+    
     # Session termination - clears authentication cookie
     path("logout", LogoutView.as_view(), name="logout"),
     
-    # Profile retrieval - gets current user's profile information
-    path("profile", ProfileView.as_view(), name="profile"),
+    # User registration - creates new account and returns JWT token
+    path("register", RegisterView.as_view(), name="register"),
     
     # =========================================================================
-    # SECURITY ENDPOINTS
+    # PROFILE MANAGEMENT ENDPOINTS
     # =========================================================================
     
-    # Password change - requires current password verification
-    path("profile/change-password", ChangePasswordView.as_view(), name="profile-change-password"),
+    # Name updates - supports both snake_case and camelCase field names
+    path("profile/name", ProfileNameView.as_view(), name="profile-name"),
     
-    # Account deletion - requires multiple safety confirmations
-    path("profile/delete-account", DeleteAccountView.as_view(), name="profile-delete-account"),
+    # Avatar upload - handles profile picture upload and processing
+    path("profile/photo", ProfilePhotoView.as_view(), name="profile-photo"),
     
     # =========================================================================
-    # PROFILE MANAGEMENT ENDPOINTS
+    # SECURITY ENDPOINTS
     # =========================================================================
     
-    # Avatar upload - handles profile picture upload and processing
-    path("profile/photo", ProfilePhotoView.as_view(), name="profile-photo"),
+    # Password change - requires current password verification
+    path("profile/change-password", ChangePasswordView.as_view(), name="profile-change-password"),
     
-    # Name updates - supports both snake_case and camelCase field names
-    path("profile/name", ProfileNameView.as_view(), name="profile-name"),
+    # Account deletion - requires multiple safety confirmations
+    path("profile/delete-account", DeleteAccountView.as_view(), name="profile-delete-account"),
 ]
 
 
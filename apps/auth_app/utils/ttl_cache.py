@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry and a size cap.
+
+    When full, the oldest inserted entry is evicted (dicts keep insertion order).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict = {}  # key -> (value, expires_at_ts)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if not item:
+            return None
+        value, expires_at = item
+        if expires_at <= time.time():
+            self.pop(key)
+            return None
+        return value
+
+    def set(self, key, value, expires_at: float | None = None) -> None:
+        now = time.time()
+        expires_at = min(now + self.ttl, expires_at) if expires_at else now + self.ttl
+        if expires_at <= now:
+            return
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)), None)
+            self._data[key] = (value, expires_at)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
@@ -1,4 +1,3 @@
-```python
 """
 View controllers for VulnScan authentication application.
 
@@ -21,9 +20,9 @@ Security Features:
 - Input validation at both serializer and view levels
 """
 
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -32,8 +31,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 
-from .authentication import CookieJWTAuthentication
+from .authentication import CookieJWTAuthentication, invalidate_cached_user
 from .jwt_utils import create_jwt_for_user
+from .revocation import revoke_token
 from .serializers import (
     RegisterSerializer,
     LoginSerializer,
@@ -50,8 +50,33 @@ from .models import UserProfile
 AUTH_COOKIE_NAME = "auth_token"
 AUTH_COOKIE_AGE = 7 * 24 * 60 * 60  # 7 days in seconds
 
-# Security note: Set secure=True in production when using HTTPS
-COOKIE_SECURE_SETTING = False  # Change to True in production environment
+# Secure (HTTPS-only) cookies whenever the site isn't running in DEBUG mode
+COOKIE_SECURE_SETTING = not settings.DEBUG
+
+# Attributes shared by every auth cookie the API issues
+_AUTH_COOKIE_KWARGS = {
+    "httponly": True,                  # Prevent XSS access
+    "samesite": "Strict",              # CSRF protection
+    "secure": COOKIE_SECURE_SETTING,   # HTTPS only in production
+    "max_age": AUTH_COOKIE_AGE,        # 7 days expiration
+    "path": "/",                       # Available across entire site
+}
+
+
+def _issue_auth_cookie(response, token):
+    """Attach the auth_token cookie carrying `token` to `response`."""
+    response.set_cookie(AUTH_COOKIE_NAME, token, **_AUTH_COOKIE_KWARGS)
+
+
+def _revoke_request_token(request):
+    """
+    Revoke the JWT the current request was authenticated with.
+    
+    Relies on the payload CookieJWTAuthentication memoizes on the request.
+    """
+    payload = getattr(request, "_cached_auth_payload", None)
+    if request.auth and payload:
+        revoke_token(request.auth, payload["exp"])
 
 
 class RegisterView(APIView):
@@ -104,28 +129,12 @@ class RegisterView(APIView):
             
             # Build success response with user data
             response = Response(
-                {
-                    "user": {
-                        "userId": f"u_{user.id}",
-                        "email": user.email,
-                        "firstName": user.first_name,
-                        "lastName": user.last_name,
-                        "createdAt": getattr(user, "date_joined", timezone.now()).isoformat(),
-                    }
-                },
+                {"user": ProfileSerializer(user, context={"request": request}).data},
                 status=status.HTTP_201_CREATED,
             )
             
             # Set authentication cookie for automatic login
-            response.set_cookie(
-                AUTH_COOKIE_NAME,
-                token,
-                httponly=True,      # Prevent XSS access
-                samesite="Strict",  # CSRF protection
-                secure=COOKIE_SECURE_SETTING,  # HTTPS only in production
-                max_age=AUTH_COOKIE_AGE,       # 7 days expiration
-                path="/",           # Available across entire site
-            )
+            _issue_auth_cookie(response, token)
             return response
 
         # Handle specific email conflict error
@@ -200,27 +209,12 @@ class LoginView(APIView):
         
         # Build success response
         response = Response(
-            {
-                "user": {
-                    "userId": f"u_{user.id}",
-                    "email": user.email,
-                    "firstName": user.first_name,
-                    "lastName": user.last_name,
-                }
-            },
+            {"user": ProfileSerializer(user, context={"request": request}).data},
             status=200,
         )
         
         # Set authentication cookie
-        response.set_cookie(
-            AUTH_COOKIE_NAME,
-            token,
-            httponly=True,
-            samesite="Strict",
-            secure=COOKIE_SECURE_SETTING,
-            max_age=AUTH_COOKIE_AGE,
-            path="/",
-        )
+        _issue_auth_cookie(response, token)
         return response
 
 
@@ -229,8 +223,8 @@ class LogoutView(APIView):
     Handle user logout by clearing authentication cookie.
     
     This view invalidates the user's session by removing the JWT token
-    from the client's cookies. The token itself remains valid until
-    expiration but cannot be used without the cookie.
+    from the client's cookies and adding it to the revocation list, so a
+    copied token cannot be replayed before it expires.
     
     Permissions: IsAuthenticated (requires valid JWT)
     Methods: POST only
@@ -249,6 +243,8 @@ class LogoutView(APIView):
         Returns:
             Response: 204 No Content with cleared auth cookie
         """
+        _revoke_request_token(request)
+        invalidate_cached_user(request.user.id)
         response = Response(status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie(AUTH_COOKIE_NAME, path="/")
         return response
@@ -336,6 +332,8 @@ class ChangePasswordView(APIView):
         # Update password with secure hashing
         user.set_password(serializer.validated_data["newPassword"])
         user.save()
+        invalidate_cached_user(user.id)
+        _revoke_request_token(request)
 
         # Generate new JWT token since password changed
         token = create_jwt_for_user(user)
@@ -345,15 +343,7 @@ class ChangePasswordView(APIView):
         )
         
         # Update authentication cookie with new token
-        response.set_cookie(
-            AUTH_COOKIE_NAME,
-            token,
-            httponly=True,
-            samesite="Strict",
-            secure=COOKIE_SECURE_SETTING,
-            max_age=AUTH_COOKIE_AGE,
-            path="/",
-        )
+        _issue_auth_cookie(response, token)
         return response
 
 
@@ -395,7 +385,9 @@ class DeleteAccountView(APIView):
             )
 
         # Permanently delete user account and related data
+        user_id = user.id
         user.delete()
+        invalidate_cached_user(user_id)
         
         # Clear authentication cookie
         response = Response(status=204)
@@ -464,6 +456,10 @@ class ProfilePhotoView(APIView):
         # Save new avatar
         profile.avatar.save(processed.name, processed, save=True)
 
+        # Point the (pre-joined) profile relation at the updated row
+        request.user.profile = profile
+        invalidate_cached_user(request.user.id)
+
         # Return updated user data
         data = ProfileSerializer(request.user, context={"request": request}).data
         return Response({"user": data}, status=200)
@@ -487,6 +483,7 @@ class ProfilePhotoView(APIView):
                 pass
             profile.avatar = None
             profile.save(update_fields=["avatar"])
+            invalidate_cached_user(request.user.id)
         return Response(status=204)
 
 
@@ -538,6 +535,7 @@ class ProfileNameView(APIView):
                 setattr(request.user, field, serializer.validated_data[field])
                 
         request.user.save()
+        invalidate_cached_user(request.user.id)
         
         # Return updated user data
         data = ProfileSerializer(request.user, context={"request": request}).data
@@ -579,4 +577,3 @@ Testing Recommendations:
 - Verify error responses are consistent and informative
 - Test cookie behavior across different browsers
 """
-```
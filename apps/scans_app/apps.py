@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScansAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scans_app'
+
+    def ready(self):
+        # Import signal handlers
+        from . import signals  # noqa: F401
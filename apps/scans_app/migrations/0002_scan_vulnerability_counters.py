@@ -0,0 +1,68 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_vulnerability_counters(apps, schema_editor):
+    Scan = apps.get_model("scans_app", "Scan")
+    Vulnerability = apps.get_model("scans_app", "Vulnerability")
+
+    def count(**filters):
+        per_scan = (
+            Vulnerability.objects.filter(scan=OuterRef("pk"), **filters)
+            .order_by()
+            .values("scan")
+            .annotate(c=Count("id"))
+            .values("c")[:1]
+        )
+        return Coalesce(Subquery(per_scan, output_field=models.IntegerField()), Value(0))
+
+    Scan.objects.update(
+        total_vulns=count(),
+        critical_count=count(severity="critical"),
+        high_count=count(severity="high"),
+        medium_count=count(severity="medium"),
+        low_count=count(severity="low"),
+        info_count=count(severity="info"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scans_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='total_vulns',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='critical_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='high_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='medium_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='low_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='info_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vulnerability_counters, migrations.RunPython.noop),
+    ]
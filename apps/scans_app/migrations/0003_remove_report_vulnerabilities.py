@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scans_app', '0002_scan_vulnerability_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='report',
+            name='vulnerabilities',
+        ),
+    ]
@@ -0,0 +1,60 @@
+import itertools
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_reference_links(apps, schema_editor):
+    Vulnerability = apps.get_model("scans_app", "Vulnerability")
+    VulnerabilityReference = apps.get_model("scans_app", "VulnerabilityReference")
+
+    batch = []
+    rows = (
+        Vulnerability.objects.exclude(reference_links=[])
+        .order_by()
+        .values_list("id", "reference_links")
+        .iterator(chunk_size=2000)
+    )
+    for vuln_id, links in rows:
+        batch.extend(
+            VulnerabilityReference(vuln_id=vuln_id, url=url) for url in dict.fromkeys(links)
+        )
+        if len(batch) >= 5000:
+            VulnerabilityReference.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        VulnerabilityReference.objects.bulk_create(batch)
+
+
+def restore_reference_links(apps, schema_editor):
+    Vulnerability = apps.get_model("scans_app", "Vulnerability")
+    VulnerabilityReference = apps.get_model("scans_app", "VulnerabilityReference")
+
+    rows = VulnerabilityReference.objects.order_by("vuln_id", "id").values_list("vuln_id", "url")
+    for vuln_id, group in itertools.groupby(rows.iterator(chunk_size=2000), key=lambda r: r[0]):
+        Vulnerability.objects.filter(id=vuln_id).update(reference_links=[url for _, url in group])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scans_app', '0004_scan_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VulnerabilityReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=1024)),
+                ('vuln', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='references', to='scans_app.vulnerability')),
+            ],
+            options={
+                'verbose_name': 'Vulnerability Reference',
+                'verbose_name_plural': 'Vulnerability References',
+                'ordering': ['id'],
+                'constraints': [models.UniqueConstraint(fields=('vuln', 'url'), name='vulnref_vuln_url_uniq')],
+            },
+        ),
+        migrations.RunPython(copy_reference_links, restore_reference_links),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # Separate from 0005: PostgreSQL refuses to ALTER a table with pending
+    # deferred FK checks from rows inserted in the same transaction.
+
+    dependencies = [
+        ('scans_app', '0005_vulnerabilityreference'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='vulnerability',
+            name='reference_links',
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def backfill_open_ports_total(apps, schema_editor):
+    ScanResult = apps.get_model("scans_app", "ScanResult")
+
+    batch = []
+    for result in ScanResult.objects.only("id", "open_ports").iterator(chunk_size=2000):
+        ports = result.open_ports if isinstance(result.open_ports, list) else []
+        result.open_ports_total = sum(1 for p in ports if (p or {}).get("state") == "open")
+        batch.append(result)
+        if len(batch) >= 2000:
+            ScanResult.objects.bulk_update(batch, ["open_ports_total"])
+            batch = []
+    if batch:
+        ScanResult.objects.bulk_update(batch, ["open_ports_total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scans_app', '0006_remove_vulnerability_reference_links'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanresult',
+            name='open_ports_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_open_ports_total, migrations.RunPython.noop),
+    ]
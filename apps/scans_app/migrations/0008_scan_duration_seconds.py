@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def backfill_duration_seconds(apps, schema_editor):
+    Scan = apps.get_model("scans_app", "Scan")
+
+    batch = []
+    scans = (
+        Scan.objects.filter(started_at__isnull=False, finished_at__isnull=False)
+        .only("id", "started_at", "finished_at")
+    )
+    for scan in scans.iterator(chunk_size=2000):
+        scan.duration_seconds = max(0, int((scan.finished_at - scan.started_at).total_seconds()))
+        batch.append(scan)
+        if len(batch) >= 2000:
+            Scan.objects.bulk_update(batch, ["duration_seconds"])
+            batch = []
+    if batch:
+        Scan.objects.bulk_update(batch, ["duration_seconds"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scans_app', '0007_scanresult_open_ports_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='duration_seconds',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_duration_seconds, migrations.RunPython.noop),
+    ]
@@ -3,19 +3,19 @@ Database models for VulnScan scanning application.
 
 This module defines the core data structures for vulnerability scanning operations,
 including scan sessions, results, vulnerabilities, reports, and user notes.
-The models leverage PostgreSQL-specific features like JSONB and ArrayField
-for flexible data storage while maintaining relational integrity.
+The models leverage PostgreSQL JSONB for flexible data storage while
+maintaining relational integrity.
 
 Architecture:
 - Scan: Master record for scanning sessions with status tracking
 - ScanResult: Detailed technical findings from scans (JSONB for flexibility)
 - Vulnerability: Individual security issues with severity classification
+- VulnerabilityReference: Reference URLs attached to a vulnerability
 - Report: Aggregated scan results for presentation and export
 - Note: User annotations on vulnerabilities for collaboration
 
 PostgreSQL Features Used:
 - JSONB: For schemaless storage of scan results and technical data
-- ArrayField: For storing lists of references and vulnerability IDs
 - Foreign Keys: For maintaining relational integrity with CASCADE operations
 - DateTimeField: For audit trails and temporal analysis
 """
@@ -23,7 +23,6 @@ PostgreSQL Features Used:
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.contrib.postgres.fields import ArrayField
 
 
 class Scan(models.Model):
@@ -66,10 +65,21 @@ class Scan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)   # DEFAULT NOW()
     started_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
+    # finished_at - started_at in whole seconds, set when the scan completes
+    duration_seconds = models.IntegerField(null=True, blank=True)
     
     # Human-readable time estimate for ongoing scans
     estimated_time_left = models.CharField(max_length=50, null=True, blank=True)
 
+    # Vulnerability counters, denormalized from Vulnerability rows when the
+    # scan completes so list views don't need to join the Report table
+    total_vulns = models.IntegerField(default=0)
+    critical_count = models.IntegerField(default=0)
+    high_count = models.IntegerField(default=0)
+    medium_count = models.IntegerField(default=0)
+    low_count = models.IntegerField(default=0)
+    info_count = models.IntegerField(default=0)
+
     def __str__(self):
         """Human-readable string representation for admin interface."""
         return f"[{self.id}] {self.target} ({self.mode}) - {self.status}"
@@ -79,6 +89,10 @@ class Scan(models.Model):
         verbose_name = "Vulnerability Scan"
         verbose_name_plural = "Vulnerability Scans"
         ordering = ['-created_at']  # Most recent scans first
+        indexes = [
+            # Backs the per-user scan history (filter by user, newest first)
+            models.Index(fields=['user', '-created_at'], name='scan_user_created_idx'),
+        ]
 
 
 class ScanResult(models.Model):
@@ -96,6 +110,10 @@ class ScanResult(models.Model):
     # JSONB field for open port information with service details
     open_ports = models.JSONField(default=list)   # [{"port":80,"service":"http","banner":"nginx"}, ...]
     
+    # Number of open_ports entries in state "open", stored with them so
+    # reports don't walk the JSON list
+    open_ports_total = models.IntegerField(default=0)
+    
     # JSONB field for HTTP service information and headers
     http_info = models.JSONField(default=dict)    # {"status":200,"title":"Home","server":"Apache"}
     
@@ -157,14 +175,6 @@ class Vulnerability(models.Model):
     # Recommended fix or mitigation steps
     remediation = models.TextField(null=True, blank=True)
     
-    # Array of reference URLs for additional information
-    # TEXT[] in SQL → ArrayField(CharField)
-    reference_links = ArrayField(
-        base_field=models.CharField(max_length=1024),
-        default=list,
-        blank=True,
-    )
-    
     # Current status in vulnerability management workflow
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     
@@ -178,11 +188,54 @@ class Vulnerability(models.Model):
         """Human-readable string representation."""
         return f"{self.name} ({self.severity}) - Scan #{self.scan_id}"
 
+    @property
+    def reference_links(self):
+        """
+        Reference URLs for this vulnerability, in insertion order.
+
+        Reads the `references` relation; prefetch it when listing many
+        vulnerabilities to avoid one query per row.
+        """
+        return [ref.url for ref in self.references.all()]
+
     class Meta:
         """Metadata options for Vulnerability model."""
         verbose_name = "Vulnerability"
         verbose_name_plural = "Vulnerabilities"
         ordering = ['-severity', 'name']  # Sort by severity then name
+        indexes = [
+            # Per-scan lookups and severity counts
+            models.Index(fields=['scan', 'severity'], name='vuln_scan_severity_idx'),
+        ]
+
+
+class VulnerabilityReference(models.Model):
+    """
+    Reference URL (advisory, CVE entry, vendor notice) for a vulnerability.
+    
+    Stored one row per URL rather than as an inline array, so long CVE
+    reference lists don't widen every Vulnerability row.
+    """
+    
+    # Many-to-one relationship with Vulnerability
+    vuln = models.ForeignKey(Vulnerability, on_delete=models.CASCADE, related_name="references")
+    
+    # Reference URL
+    url = models.CharField(max_length=1024)
+
+    def __str__(self):
+        """Human-readable string representation."""
+        return f"{self.url} (Vuln #{self.vuln_id})"
+
+    class Meta:
+        """Metadata options for VulnerabilityReference model."""
+        verbose_name = "Vulnerability Reference"
+        verbose_name_plural = "Vulnerability References"
+        ordering = ['id']  # Insertion order
+        constraints = [
+            # Also serves as the vuln_id lookup index
+            models.UniqueConstraint(fields=['vuln', 'url'], name='vulnref_vuln_url_uniq'),
+        ]
 
 
 class Report(models.Model):
@@ -190,8 +243,8 @@ class Report(models.Model):
     Aggregated scan results for presentation and export.
     
     Provides summarized information about a scan session suitable for
-    reports, dashboards, and external sharing. Includes statistics
-    and references to specific vulnerabilities.
+    reports, dashboards, and external sharing. The vulnerabilities it
+    covers are those of its scan (see vulnerability_ids).
     """
     
     # One-to-one relationship with Scan - each scan has one report
@@ -208,14 +261,6 @@ class Report(models.Model):
     # Total scan duration in human-readable format
     duration = models.CharField(max_length=50, null=True, blank=True)
     
-    # Array of vulnerability IDs included in this report
-    # INT[] in SQL → ArrayField(IntegerField)
-    vulnerabilities = ArrayField(
-        base_field=models.IntegerField(),
-        default=list,
-        blank=True,
-    )
-    
     # URL or path to downloadable report file (PDF, etc.)
     download_link = models.CharField(max_length=255, null=True, blank=True)
     
@@ -226,6 +271,11 @@ class Report(models.Model):
         """Human-readable string representation."""
         return f"Report for Scan #{self.scan_id}"
 
+    @property
+    def vulnerability_ids(self):
+        """IDs of the vulnerabilities found by this report's scan (one indexed query)."""
+        return list(Vulnerability.objects.filter(scan_id=self.scan_id).values_list("id", flat=True))
+
     class Meta:
         """Metadata options for Report model."""
         verbose_name = "Scan Report"
@@ -263,6 +313,9 @@ class Note(models.Model):
         verbose_name = "Vulnerability Note"
         verbose_name_plural = "Vulnerability Notes"
         ordering = ['-created_at']  # Most recent notes first
+        indexes = [
+            models.Index(fields=['vuln', '-created_at'], name='note_vuln_created_idx'),
+        ]
 
 
 """
@@ -274,23 +327,29 @@ Scan (1) ───── (1) ScanResult
    │
    ▼
 Vulnerability (1) ───── (N) Note
+   │         └──────────── (N) VulnerabilityReference
    │
    │ (N)
    │  
    ▼
-Report (includes vulnerability IDs)
+Report (vulnerabilities resolved via scan_id)
 
 Key Design Decisions:
 1. JSONB fields in ScanResult allow flexible storage of varying scan data
-2. ArrayField for reference_links enables efficient storage of URL lists
+2. Reference URLs live in a child table (VulnerabilityReference);
+   Report derives its vulnerability IDs from the scan_id FK instead of
+   storing a copy
 3. Separate Report model aggregates data for presentation layer
 4. Note model supports collaborative vulnerability management
 5. All models include created_at for audit trail
 
 Performance Considerations:
 - Foreign key indexes are automatically created by Django
+- Composite indexes back the hot paths: a user's scans newest-first,
+  a scan's vulnerabilities by severity, a vulnerability's notes
 - JSONB fields support efficient querying of nested data
-- ArrayField provides better performance than many-to-many for simple lists
+- Vulnerability.reference_links reads the `references` relation; prefetch
+  it when rendering many vulnerabilities
 - DateTime fields with timezone support for accurate timestamping
 
 Migration Safety:
@@ -0,0 +1,237 @@
+"""
+Scan report building and rendering.
+
+Shared by ScanDownloadView (synchronous downloads) and the Celery task that
+renders large PDF reports in the background.
+
+Flow:
+- build_report_context(): gather scan, result and vulnerability data into
+  the template context (also the JSON download body)
+- render_report_html(): render templates/reports/scan_report.html
+- render_report_pdf(): lay the HTML out as PDF with WeasyPrint
+
+A completed scan's data doesn't change, so rendered reports are kept:
+PDFs in report_storage (settings.REPORTS_ROOT, not publicly served) under
+report_pdf_name(), HTML and JSON in the cache under report_cache_key(). Both names include the scan's finish time, so a
+re-run scan never serves a stale report.
+"""
+
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+import django.db.models as djm
+from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from .models import Report, ScanResult, VulnerabilityReference
+from .utils import cache
+
+# Private storage for rendered PDFs; never exposed under MEDIA_URL, so
+# ScanDownloadView's ownership check is the only way to read them
+report_storage = FileSystemStorage(location=settings.REPORTS_ROOT)
+
+# PDF reports of scans with more findings than this are rendered by a
+# Celery task instead of inside the request
+REPORT_SYNC_MAX_VULNS = 200
+
+# Created once per process: setting up font lookup is a fixed cost of
+# every WeasyPrint render otherwise
+FONT_CONFIG = FontConfiguration()
+
+# How long rendered HTML/JSON reports stay cached
+REPORT_CACHE_TTL = 86400
+
+# Most severe first. Built once; querysets copy expressions when resolving
+# them, so sharing the instance is safe.
+SEVERITY_ORDER = djm.Case(
+    djm.When(severity="critical", then=djm.Value(0)),
+    djm.When(severity="high",    then=djm.Value(1)),
+    djm.When(severity="medium",  then=djm.Value(2)),
+    djm.When(severity="low",     then=djm.Value(3)),
+    djm.When(severity="info",    then=djm.Value(4)),
+    default=djm.Value(5),
+    output_field=djm.IntegerField(),
+)
+
+
+def format_duration(secs):
+    """
+    Return a short human-readable duration (e.g. '1 min 22 sec') for a
+    scan's stored duration_seconds; '—' when it has none. For rendered
+    reports: the scan list API returns null instead of the placeholder.
+    """
+    if secs is None:
+        return "—"
+    return f"{secs // 60} min {secs % 60} sec"
+
+
+def _sev_summary(scan):
+    """
+    Counts by severity, from the counters stored on the scan at completion
+    (no pass over the vulnerabilities, no aggregate query).
+    """
+    return {
+        "critical": scan.critical_count,
+        "high": scan.high_count,
+        "medium": scan.medium_count,
+        "low": scan.low_count,
+        "info": scan.info_count,
+        "total": scan.total_vulns,
+    }
+
+
+def user_display_name(user):
+    """Name printed on the report cover."""
+    return f"{getattr(user, 'first_name', 'User')} {getattr(user, 'last_name', '')}".strip()
+
+
+def _finished_ts(scan):
+    return int(scan.finished_at.timestamp()) if scan.finished_at else 0
+
+
+def report_pdf_name(scan):
+    """Storage path of the rendered PDF for this run of the scan."""
+    return f"scan_{scan.id}_{_finished_ts(scan)}.pdf"
+
+
+def report_cache_key(scan, fmt):
+    """Cache key of the rendered `fmt` ("html"/"json") report for this run of the scan."""
+    return cache.cache_key("report", str(scan.id), str(_finished_ts(scan)), fmt)
+
+
+def store_report_pdf(scan, pdf):
+    """Save rendered PDF bytes (unless already stored) and link them from the Report."""
+    name = report_pdf_name(scan)
+    if not report_storage.exists(name):
+        name = report_storage.save(name, ContentFile(pdf))
+    Report.objects.filter(scan_id=scan.id).update(download_link=name)
+    return name
+
+
+def delete_report_pdf(name):
+    """Remove a stored PDF once the current transaction commits (no-op for None)."""
+    if name:
+        transaction.on_commit(lambda: report_storage.delete(name))
+
+
+def iter_report_vulns(scan, chunk_size=500):
+    """
+    Yield the scan's findings as report rows, most severe first.
+
+    Rows are read `chunk_size` at a time, with the reference URLs of each
+    chunk fetched in one query, so memory stays bounded by the chunk.
+    """
+    # Plain rows of only the columns the report shows (impact/evidence/
+    # status stay unread); no model instances are built
+    rows = (
+        scan.vulnerabilities.values("id", "severity", "name", "path", "description", "remediation")
+        .order_by(SEVERITY_ORDER, "name")
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        refs: dict[int, list[str]] = {}
+        for vuln_id, url in (
+            VulnerabilityReference.objects.filter(vuln_id__in=[v["id"] for v in chunk])
+            .order_by("id")
+            .values_list("vuln_id", "url")
+        ):
+            refs.setdefault(vuln_id, []).append(url)
+        for v in chunk:
+            yield {
+                "severity": (v["severity"] or "info"),
+                "name": v["name"],
+                "host": scan.target,
+                "path": v["path"] or "",
+                "description": v["description"] or "",
+                "remediation": v["remediation"] or "",
+                "references": refs.get(v["id"], []),
+            }
+
+
+class LazyReportVulns:
+    """
+    Re-iterable stand-in for the findings list: each iteration runs
+    iter_report_vulns() afresh (and so re-reads the findings).
+    """
+
+    def __init__(self, scan):
+        self.scan = scan
+
+    def __iter__(self):
+        return iter_report_vulns(self.scan)
+
+
+def build_report_context(scan, user_name, lazy_vulns=False):
+    """
+    Template context for a completed scan's report.
+
+    `scan` should come with its result row joined (select_related("result")).
+    With lazy_vulns, "vulns" and the host's "vulnMatches" are a
+    LazyReportVulns instead of a list, for streaming the JSON report
+    without holding every finding in memory.
+    """
+    # 1) Pull related data (safe defaults)
+    try:
+        result: ScanResult = scan.result
+    except ScanResult.DoesNotExist:
+        result = None
+
+    # 2) Findings, for both the host block and the report table
+    vulns = LazyReportVulns(scan) if lazy_vulns else list(iter_report_vulns(scan))
+
+    # 3) Build hosts structure compatible with template
+    hosts: list[dict] = []
+    if result:
+        hosts.append({
+            "ip": scan.target,
+            "reachable": bool(getattr(result, "open_ports", None)),
+            "ports": getattr(result, "open_ports", []) or [],
+            "http": getattr(result, "http_info", None),
+            "tls": getattr(result, "tls_info", None),
+            "vulnMatches": vulns,
+        })
+
+    # 4) Aggregates
+    sev = _sev_summary(scan)  # -> {critical,high,medium,low,info,total}
+    duration = format_duration(scan.duration_seconds)
+
+    open_ports_total = result.open_ports_total if result else 0
+
+    # widths for the severity bar in template
+    scale = 100.0 / max(1, sev["total"])
+    widths = {k: round(sev[k] * scale, 2) for k in ("critical", "high", "medium", "low", "info")}
+
+    return {
+        "app_name": "VulnScanner",
+        "logo_text": "VulnScanner",
+        "generated_at": timezone.now(),
+        "user_name": user_name,
+        "scan": {
+            "target": scan.target,
+            "type": scan.mode,
+            "status": scan.status,
+            "createdAt": scan.created_at.isoformat(),
+            "finishedAt": scan.finished_at.isoformat() if scan.finished_at else "",
+            "results": {"summary": {"hostsScanned": 1}, "hosts": hosts},
+        },
+        "hosts": hosts,
+        "vulns": vulns,
+        "sev": sev,
+        "widths": widths,
+        "duration": duration,
+        "open_ports_total": open_ports_total,
+    }
+
+
+def render_report_html(context):
+    return render_to_string("reports/scan_report.html", context)
+
+
+def render_report_pdf(html, base_url):
+    """PDF bytes for the rendered report; base_url resolves static assets."""
+    return HTML(string=html, base_url=base_url).write_pdf(font_config=FONT_CONFIG)
@@ -16,7 +16,7 @@ Key Features:
 - Nested relationships for comprehensive scan data
 - Field optimization for different use cases
 - Read-only fields for calculated properties
-- Support for PostgreSQL JSONB and ArrayField types
+- Support for PostgreSQL JSONB fields and reference rows (VulnerabilityReference)
 """
 
 from rest_framework import serializers
@@ -93,11 +93,16 @@ class ReportSerializer(serializers.ModelSerializer):
     - generated_at: Timestamp when report was generated
     """
     
+    vulnerabilities = serializers.SerializerMethodField()
+
     class Meta:
         model = Report
         fields = ["total", "critical", "high", "medium", "low", "info", "duration", 
                  "vulnerabilities", "download_link", "generated_at"]
 
+    def get_vulnerabilities(self, obj):
+        return obj.vulnerability_ids
+
 
 class ScanSerializer(serializers.ModelSerializer):
     """
@@ -116,7 +121,7 @@ class ScanSerializer(serializers.ModelSerializer):
     - Basic scan metadata: id, target, mode, status, progress, timestamps
     - Nested objects: result, vulnerabilities, report
     - Progress tracking: progress, estimated_time_left
-    - Timing information: created_at, started_at, finished_at
+    - Timing information: created_at, started_at, finished_at, duration_seconds
     """
     
     # Nested serializers for related objects
@@ -128,7 +133,7 @@ class ScanSerializer(serializers.ModelSerializer):
         model = Scan
         fields = [
             "id", "target", "mode", "status", "progress", "created_at",
-            "started_at", "finished_at", "estimated_time_left",
+            "started_at", "finished_at", "duration_seconds", "estimated_time_left",
             "result", "vulnerabilities", "report",
         ]
 
@@ -176,7 +181,8 @@ Serialization Patterns:
 
 Performance Considerations:
 - Nested serializers can cause N+1 query problems
-- Consider using select_related and prefetch_related in views
+- Views must select_related/prefetch_related the relations they
+  serialize (e.g. ScanResultView loads Scan with select_related("result"))
 - Use specific serializers for different API endpoints
 - Limit nested depth for large result sets
 
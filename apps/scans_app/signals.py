@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import Report
+from .reports import delete_report_pdf
+
+@receiver(post_delete, sender=Report)
+def delete_stored_pdf(sender, instance, **kwargs):
+    # also runs for the cascades from Scan and User (account) deletion
+    delete_report_pdf(instance.download_link)
@@ -1,10 +1,39 @@
 import time
+from collections import Counter
 from django.utils import timezone
 from django.db import transaction
-from .models import Scan, ScanResult, Vulnerability, Report
-from apps.scans_app.utils.scanner import run_scan
+from .models import Scan, ScanResult, Vulnerability, VulnerabilityReference, Report
+from .reports import (
+    build_report_context,
+    delete_report_pdf,
+    format_duration,
+    render_report_html,
+    render_report_pdf,
+    report_pdf_name,
+    report_storage,
+    store_report_pdf,
+    user_display_name,
+)
+from apps.scans_app.utils.scanner import run_scan_stream
+from apps.scans_app.utils import cache
 from celery import shared_task  # type: ignore[reportMissingImports]
 
+# Upper bound on how long a queued PDF render blocks re-queuing it
+REPORT_PDF_PENDING_TTL = 600
+
+# Values of the pending key: render queued / render raised. A failure is
+# kept for REPORT_PDF_FAILED_TTL so downloads report it (instead of
+# re-queuing the same failing render) until a retry is allowed.
+REPORT_PDF_PENDING = "1"
+REPORT_PDF_FAILED = "failed"
+REPORT_PDF_FAILED_TTL = 300
+
+def most_common_vulns_cache_key(user_id: int) -> str:
+    return cache.cache_key("most_common_vulns", str(user_id))
+
+def report_pdf_pending_cache_key(scan_id: int) -> str:
+    return cache.cache_key("report_pdf_pending", str(scan_id))
+
 def _tick_progress(scan: Scan, step: int, total_steps: int):
     scan.refresh_from_db()
     if scan.status == "canceled":
@@ -42,13 +71,25 @@ def run_scan_task(self, scan_id: int):
                 scan.save(update_fields=["finished_at"])
                 return
 
-        results = run_scan(scan.id, scan.target, scan.mode)
+        results = {}
+        scan_parts = run_scan_stream(scan.id, scan.target, scan.mode)
+        for key, value in scan_parts:
+            results[key] = value
+            # the CVE lookups come next and are the slow part: honour a
+            # cancel that arrived during the network probes before starting them
+            if key == "tls_info" and Scan.objects.filter(id=scan.id, status="canceled").exists():
+                scan_parts.close()
+                scan.finished_at = timezone.now()
+                scan.save(update_fields=["finished_at"])
+                return
 
         with transaction.atomic():
+            open_ports = results.get("open_ports", [])
             ScanResult.objects.update_or_create(
                 scan=scan,
                 defaults=dict(
-                    open_ports=results.get("open_ports", []),
+                    open_ports=open_ports,
+                    open_ports_total=sum(1 for p in open_ports if (p or {}).get("state") == "open"),
                     http_info=results.get("http_info", {}),
                     tls_info=results.get("tls_info", {}),
                     raw_output=results,
@@ -58,43 +99,74 @@ def run_scan_task(self, scan_id: int):
             scan.vulnerabilities.all().delete()
 
             vulns = results.get("vulnerabilities", []) or []
-            vuln_ids = []
-            severity_count = {"critical":0,"high":0,"medium":0,"low":0,"info":0}
-            for v in vulns:
-                vuln = Vulnerability.objects.create(
-                    scan=scan,
-                    severity=v.get("severity","info"),
-                    name=v.get("name","Unknown"),
-                    path=v.get("path"),
-                    description=v.get("description"),
-                    impact=v.get("impact"),
-                    remediation=v.get("remediation"),
-                    reference_links=v.get("reference_links", []),
-                )
-                vuln_ids.append(vuln.id)
-                sev = v.get("severity","info")
-                if sev in severity_count:
-                    severity_count[sev] += 1
+            # One multi-row INSERT per batch; PostgreSQL returns the new ids,
+            # which the reference rows below need
+            created = Vulnerability.objects.bulk_create(
+                [
+                    Vulnerability(
+                        scan=scan,
+                        severity=v.get("severity","info"),
+                        name=v.get("name","Unknown"),
+                        path=v.get("path"),
+                        description=v.get("description"),
+                        impact=v.get("impact"),
+                        remediation=v.get("remediation"),
+                    )
+                    for v in vulns
+                ],
+                batch_size=500,
+            )
+            VulnerabilityReference.objects.bulk_create(
+                [
+                    VulnerabilityReference(vuln=vuln, url=url)
+                    for vuln, v in zip(created, vulns)
+                    for url in dict.fromkeys(v.get("reference_links") or [])
+                ],
+                batch_size=500,
+            )
+
+            # Counted from the findings already in memory: no aggregate query
+            # over the rows just inserted. Missing severities count as 0.
+            severity_count = Counter(v.get("severity","info") for v in vulns)
+
+            finished_at = timezone.now()
+            duration_seconds = max(0, int((finished_at - scan.started_at).total_seconds()))
 
+            # a re-run gets a new PDF name; the previous run's file goes
+            old_pdf = Report.objects.filter(scan=scan).values_list("download_link", flat=True).first()
             Report.objects.update_or_create(
                 scan=scan,
                 defaults=dict(
-                    total=len(vuln_ids),
+                    download_link=None,
+                    total=len(vulns),
                     critical=severity_count["critical"],
                     high=severity_count["high"],
                     medium=severity_count["medium"],
                     low=severity_count["low"],
                     info=severity_count["info"],
-                    duration="~1m",
-                    vulnerabilities=vuln_ids,
+                    duration=format_duration(duration_seconds),
                 ),
             )
+            delete_report_pdf(old_pdf)
 
+            scan.total_vulns = len(vulns)
+            scan.critical_count = severity_count["critical"]
+            scan.high_count = severity_count["high"]
+            scan.medium_count = severity_count["medium"]
+            scan.low_count = severity_count["low"]
+            scan.info_count = severity_count["info"]
             scan.status = "completed"
             scan.progress = 100
-            scan.finished_at = timezone.now()
+            scan.finished_at = finished_at
+            scan.duration_seconds = duration_seconds
             scan.estimated_time_left = None
-            scan.save(update_fields=["status","progress","finished_at","estimated_time_left"])
+            scan.save(update_fields=[
+                "status","progress","finished_at","duration_seconds","estimated_time_left",
+                "total_vulns","critical_count","high_count","medium_count","low_count","info_count",
+            ])
+
+        # new findings change the user's vulnerability statistics
+        cache.delete(most_common_vulns_cache_key(scan.user_id))
 
     except Exception:
         with transaction.atomic():
@@ -103,3 +175,25 @@ def run_scan_task(self, scan_id: int):
             scan.finished_at = timezone.now()
             scan.estimated_time_left = None
             scan.save(update_fields=["status","progress","finished_at","estimated_time_left"])
+
+@shared_task(name="apps.scans_app.tasks.render_report_pdf_task")
+def render_report_pdf_task(scan_id: int, base_url: str):
+    """Render a completed scan's PDF report into storage (see ScanDownloadView)."""
+    try:
+        scan = (
+            Scan.objects.select_related("result", "user")
+            .defer("result__raw_output")
+            .get(id=scan_id, status="completed")
+        )
+    except Scan.DoesNotExist:
+        return
+
+    pending_key = report_pdf_pending_cache_key(scan.id)
+    try:
+        if not report_storage.exists(report_pdf_name(scan)):
+            html = render_report_html(build_report_context(scan, user_display_name(scan.user)))
+            store_report_pdf(scan, render_report_pdf(html, base_url))
+    except Exception:
+        cache.set(pending_key, REPORT_PDF_FAILED, ttl=REPORT_PDF_FAILED_TTL)
+        raise
+    cache.delete(pending_key)
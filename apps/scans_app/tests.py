@@ -1,3 +1,358 @@
-from django.test import TestCase
+import errno
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import reports
+from .models import Report, Scan, Vulnerability, VulnerabilityReference
+from .tasks import REPORT_PDF_PENDING, render_report_pdf_task, report_pdf_pending_cache_key
+from .utils import cache
+from .utils.scanner import _scan_ports
+from .views import (
+    ScanListCreateView,
+    _decode_scan_cursor,
+    _encode_scan_cursor,
+    _scan_summary_for_list,
+)
+
+
+class MemoryCacheTests(SimpleTestCase):
+    """In-memory fallback of utils.cache (used when Redis is unavailable)."""
+
+    def setUp(self):
+        patcher = mock.patch.object(cache, "get_client", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache._memory_store.clear()
+        cache._ttl_heap.clear()
+        self.addCleanup(cache._memory_store.clear)
+        self.addCleanup(cache._ttl_heap.clear)
+
+    def test_set_get_delete(self):
+        cache.set_json("k", {"a": [1, 2]})
+        self.assertEqual(cache.get_json("k"), {"a": [1, 2]})
+        self.assertEqual(cache.mget_json(["k", "missing"]), [{"a": [1, 2]}, None])
+        cache.delete("k")
+        self.assertIsNone(cache.get("k"))
+
+    def test_least_recently_used_entry_evicted(self):
+        with mock.patch.object(cache, "_MEMORY_MAX", 2):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.get("a")  # "b" is now the least recently used
+            cache.set("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_entries_expire(self):
+        cache.set("short", "x", ttl=10)
+        cache.set("long", "y", ttl=100)
+        later = time.time() + 50
+        with mock.patch.object(cache.time, "time", return_value=later):
+            self.assertIsNone(cache.get("short"))
+            self.assertEqual(cache.get("long"), "y")
+            # the next write purges expired entries via the heap
+            cache.set("other", "z")
+        self.assertNotIn("short", cache._memory_store)
+
+    def test_rewritten_key_keeps_its_new_expiry(self):
+        cache.set("k", "old", ttl=10)
+        cache.set("k", "new", ttl=100)
+        later = time.time() + 50
+        with mock.patch.object(cache.time, "time", return_value=later):
+            cache.set("other", "z")  # purges the stale heap item for "k"
+            self.assertEqual(cache.get("k"), "new")
+
+
+class ScanPortsTests(SimpleTestCase):
+    """_scan_ports() against sockets on localhost."""
+
+    def _listen(self, banner=None):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        self.addCleanup(server.close)
+
+        def serve():
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn:
+                if banner:
+                    conn.sendall(banner)
+                time.sleep(0.2)
+
+        threading.Thread(target=serve, daemon=True).start()
+        return server.getsockname()[1]
+
+    def _closed_port(self):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+        s.close()
+        return port
+
+    def test_open_and_closed_ports(self):
+        open_port = self._listen(banner=b"SSH-2.0-test\r\n")
+        closed_port = self._closed_port()
+
+        entries, held = _scan_ports("127.0.0.1", [open_port, closed_port], timeout=1.0)
+
+        self.assertEqual(held, {})
+        self.assertEqual([e["port"] for e in entries], [open_port, closed_port])
+        self.assertEqual(entries[0]["state"], "open")
+        self.assertEqual(entries[0]["banner"], "SSH-2.0-test")
+        self.assertEqual(entries[1]["state"], "closed")
+        self.assertIsNone(entries[1]["banner"])
+
+    def test_hold_open_returns_connected_socket(self):
+        port = self._listen()
+
+        entries, held = _scan_ports("127.0.0.1", [port], timeout=1.0, hold_open=(port,))
+        self.addCleanup(lambda: [s.close() for s in held.values()])
+
+        self.assertEqual(entries[0]["state"], "open")
+        self.assertIsNone(entries[0]["banner"])
+        self.assertEqual(list(held), [port])
+        self.assertEqual(held[port].getpeername()[1], port)
+
+    def _resolve_to(self, *addrs):
+        infos = [
+            (socket.AF_INET6 if ":" in a else socket.AF_INET, socket.SOCK_STREAM, 6, "",
+             (a, 0, 0, 0) if ":" in a else (a, 0))
+            for a in addrs
+        ]
+        return mock.patch.object(socket, "getaddrinfo", return_value=infos)
+
+    def _connect_ex(self, **errors):
+        """Patch connect_ex to fail with errors[addr]; record the addresses tried."""
+        tried, real = [], socket.socket.connect_ex
+
+        def connect_ex(sock, address):
+            tried.append(address[0])
+            return errors[address[0]] if address[0] in errors else real(sock, address)
+
+        return mock.patch.object(socket.socket, "connect_ex", connect_ex), tried
+
+    def test_falls_back_to_next_address_when_first_is_unreachable(self):
+        port = self._listen()
+        patch, tried = self._connect_ex(**{"10.255.0.1": errno.ENETUNREACH})
+        with self._resolve_to("10.255.0.1", "127.0.0.1"), patch:
+            entries, _ = _scan_ports("dual.example", [port], timeout=0.5)
+        self.assertEqual(tried, ["10.255.0.1", "127.0.0.1"])
+        self.assertEqual(entries[0]["state"], "open")
+
+    def test_refused_first_address_is_final(self):
+        port = self._listen()
+        patch, tried = self._connect_ex(**{"10.255.0.1": errno.ECONNREFUSED})
+        with self._resolve_to("10.255.0.1", "127.0.0.1"), patch:
+            entries, _ = _scan_ports("dual.example", [port], timeout=0.5)
+        self.assertEqual(tried, ["10.255.0.1"])
+        self.assertEqual(entries[0]["state"], "closed")
+
+    def test_ipv4_address_swept_first(self):
+        port = self._listen()
+        patch, tried = self._connect_ex()
+        with self._resolve_to("::1", "127.0.0.1"), patch:
+            entries, _ = _scan_ports("dual.example", [port], timeout=0.5)
+        self.assertEqual(tried, ["127.0.0.1"])
+        self.assertEqual(entries[0]["state"], "open")
+
+    def test_unresolvable_host_reports_all_closed(self):
+        entries, held = _scan_ports("host.invalid", [80, 443], timeout=0.5)
+        self.assertEqual(held, {})
+        self.assertEqual([e["state"] for e in entries], ["closed", "closed"])
+
+
+class ScanListPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="pw")
+        other = User.objects.create_user("bob", password="pw")
+        base = timezone.now()
+        cls.scans = []
+        # two scans share a timestamp, so ids must break the tie
+        for minutes in (0, 1, 1, 2, 3):
+            scan = Scan.objects.create(user=cls.user, target="example.com", mode="quick")
+            Scan.objects.filter(id=scan.id).update(created_at=base - timedelta(minutes=minutes))
+            cls.scans.append(scan)
+        Scan.objects.create(user=other, target="example.org", mode="quick")
+        cls.expected = [
+            f"s_{s.id}"
+            for s in Scan.objects.filter(user=cls.user).order_by("-created_at", "-id")
+        ]
+
+    def _get(self, **params):
+        request = APIRequestFactory().get("/api/scans/", params)
+        force_authenticate(request, user=self.user)
+        return ScanListCreateView.as_view()(request)
+
+    def test_cursor_pages_cover_the_list_once(self):
+        seen, cursor = [], None
+        for _ in range(10):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self._get(**params)
+            self.assertEqual(response.status_code, 200)
+            seen += [s["scanId"] for s in response.data["scans"]]
+            cursor = response.data.get("nextCursor")
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_offset_pagination_still_supported(self):
+        response = self._get(limit=2, offset=2)
+        self.assertEqual([s["scanId"] for s in response.data["scans"]], self.expected[2:4])
+
+    def test_no_cursor_on_last_page(self):
+        response = self._get(limit=10)
+        self.assertEqual(len(response.data["scans"]), 5)
+        self.assertNotIn("nextCursor", response.data)
+
+    def test_invalid_cursor_rejected(self):
+        response = self._get(cursor="not a cursor")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_round_trip(self):
+        created_at = timezone.now()
+        self.assertEqual(_decode_scan_cursor(_encode_scan_cursor(created_at, 5)), (created_at, 5))
+        self.assertIsNone(_decode_scan_cursor("!!!"))
+
+
+class ScanListSummaryTests(SimpleTestCase):
+
+    def _row(self, secs):
+        return (1, "example.com", "quick", "completed", 100, timezone.now(), secs, 0, 0, 0, 0, 0)
+
+    def test_duration_formatted(self):
+        self.assertEqual(_scan_summary_for_list(self._row(220))["duration"], "3 min 40 sec")
+
+    def test_unknown_duration_is_null(self):
+        self.assertIsNone(_scan_summary_for_list(self._row(None))["duration"])
+
+
+class ScanReportViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="pw")
+        cls.scan = Scan.objects.create(
+            user=cls.user, target="example.com", mode="quick", status="completed",
+            finished_at=timezone.now(), duration_seconds=82,
+            total_vulns=2, high_count=1, low_count=1,
+        )
+        low = Vulnerability.objects.create(scan=cls.scan, severity="low", name="Banner")
+        high = Vulnerability.objects.create(scan=cls.scan, severity="high", name="XSS", path="/q")
+        VulnerabilityReference.objects.create(vuln=high, url="https://owasp.org/xss")
+        cls.high, cls.low = high, low
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_report_lists_findings_most_severe_first(self):
+        response = self.client.get(reverse("scan-report", args=[self.scan.id]))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["scanId"], f"s_{self.scan.id}")
+        self.assertEqual(
+            data["summary"],
+            {"total": 2, "critical": 0, "high": 1, "medium": 0, "low": 1, "info": 0,
+             "duration": "1 min 22 sec"},
+        )
+        self.assertEqual([v["id"] for v in data["vulnerabilities"]],
+                         [f"vuln_{self.high.id}", f"vuln_{self.low.id}"])
+        self.assertEqual(data["vulnerabilities"][0]["references"], ["https://owasp.org/xss"])
+        self.assertEqual(data["vulnerabilities"][1]["references"], [])
+
+    def test_other_users_scan_not_found(self):
+        other = User.objects.create_user("bob", password="pw")
+        self.client.force_authenticate(other)
+        response = self.client.get(reverse("scan-report", args=[self.scan.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unfinished_scan_conflict(self):
+        Scan.objects.filter(id=self.scan.id).update(status="running")
+        response = self.client.get(reverse("scan-report", args=[self.scan.id]))
+        self.assertEqual(response.status_code, 409)
+
+
+class StoredReportPdfTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.storage = FileSystemStorage(location=tmp.name)
+        patcher = mock.patch.object(reports, "report_storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("alice", password="pw")
+        self.scan = Scan.objects.create(
+            user=self.user, target="example.com", mode="quick", status="completed",
+            finished_at=timezone.now(),
+        )
+        Report.objects.create(scan=self.scan)
+        self.name = reports.store_report_pdf(self.scan, b"%PDF-1.7")
+        self.assertTrue(self.storage.exists(self.name))
+
+    def test_deleting_the_scan_removes_its_pdf(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scan.delete()
+        self.assertFalse(self.storage.exists(self.name))
+
+    def test_deleting_the_account_removes_its_pdfs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(self.storage.exists(self.name))
+
+
+class BackgroundPdfDownloadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="pw")
+        cls.scan = Scan.objects.create(
+            user=cls.user, target="example.com", mode="quick", status="completed",
+            finished_at=timezone.now(), total_vulns=reports.REPORT_SYNC_MAX_VULNS + 1,
+        )
+
+    def setUp(self):
+        patcher = mock.patch.object(cache, "get_client", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache._memory_store.clear)
+        self.pending_key = report_pdf_pending_cache_key(self.scan.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _download(self):
+        return self.client.get(reverse("scan-download", args=[self.scan.id]))
+
+    def test_render_queued_once(self):
+        with mock.patch.object(render_report_pdf_task, "delay") as delay:
+            self.assertEqual(self._download().status_code, 202)
+            self.assertEqual(self._download().status_code, 202)
+        delay.assert_called_once()
+        self.assertEqual(cache.get(self.pending_key), REPORT_PDF_PENDING)
+
+    def test_pending_marker_dropped_when_queuing_fails(self):
+        with mock.patch.object(render_report_pdf_task, "delay", side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                self._download()
+        self.assertIsNone(cache.get(self.pending_key))
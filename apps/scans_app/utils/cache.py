@@ -1,46 +1,21 @@
 # apps/scans_app/utils/cache.py
-import os, json, time
+import os, json, time, heapq, threading
+from collections import OrderedDict
 from typing import Any, Optional
 
+from vulnscanner.redis_client import get_client
+
 try:
-    import redis  # optional; we already depend on it for Celery
+    import orjson  # optional; much faster encode/decode of cached JSON
 except Exception:  # pragma: no cover
-    redis = None
-
-_redis_client = None
-_memory_store: dict[str, tuple[str, Optional[float]]] = {}  # key -> (json_str, expires_at_ts)
-
-
-def _pick_redis_url() -> Optional[str]:
-    """
-    Prefer REDIS_URL. If not set, try Celery's result backend, then broker.
-    Return None if nothing suitable.
-    """
-    url = (
-        os.getenv("REDIS_URL")
-        or os.getenv("CELERY_RESULT_BACKEND")
-        or os.getenv("CELERY_BROKER_URL")
-    )
-    if url and url.startswith("redis://"):
-        return url
-    return None
-
-
-def get_client():
-    """
-    Create a singleton Redis client when possible; otherwise return None
-    to indicate using the in-memory fallback.
-    """
-    global _redis_client
-    if _redis_client is not None:
-        return _redis_client
+    orjson = None
 
-    url = _pick_redis_url()
-    if redis and url:
-        _redis_client = redis.Redis.from_url(url, decode_responses=True)
-    else:
-        _redis_client = None
-    return _redis_client
+# In-memory fallback: a bounded LRU (oldest first) plus a heap of expiry
+# times so expired entries are dropped without scanning the whole store.
+_MEMORY_MAX = int(os.getenv("CACHE_MEMORY_MAX", "10000"))
+_memory_store: "OrderedDict[str, tuple[str, Optional[float]]]" = OrderedDict()  # key -> (json_str, expires_at_ts)
+_ttl_heap: list[tuple[float, str]] = []  # (expires_at_ts, key); may hold stale entries
+_memory_lock = threading.Lock()
 
 
 # ---------- Primitive string API ----------
@@ -55,14 +30,48 @@ def get(key: str) -> Optional[str]:
             pass
 
     # in-memory fallback with TTL
-    item = _memory_store.get(key)
-    if not item:
-        return None
-    value, expires_at = item
-    if expires_at and expires_at < time.time():
-        _memory_store.pop(key, None)
-        return None
-    return value
+    return _memory_get(key)
+
+
+def _memory_get(key: str) -> Optional[str]:
+    with _memory_lock:
+        item = _memory_store.get(key)
+        if not item:
+            return None
+        value, expires_at = item
+        if expires_at and expires_at < time.time():
+            _memory_store.pop(key, None)
+            return None
+        _memory_store.move_to_end(key)
+        return value
+
+
+def _memory_set(key: str, value: str, expires_at: Optional[float]) -> None:
+    with _memory_lock:
+        _purge_expired()
+        _memory_store[key] = (value, expires_at)
+        _memory_store.move_to_end(key)
+        if expires_at:
+            heapq.heappush(_ttl_heap, (expires_at, key))
+        while len(_memory_store) > _MEMORY_MAX:
+            _memory_store.popitem(last=False)
+        if len(_ttl_heap) > 2 * _MEMORY_MAX:
+            # too many stale heap items (rewritten/evicted keys): rebuild
+            _ttl_heap[:] = [(exp, k) for k, (_, exp) in _memory_store.items() if exp]
+            heapq.heapify(_ttl_heap)
+
+
+def _purge_expired() -> None:
+    """
+    Drop expired entries from the memory store. Heap items whose key was
+    since rewritten or evicted are discarded. Caller holds _memory_lock.
+    """
+    now = time.time()
+    while _ttl_heap and _ttl_heap[0][0] < now:
+        expires_at, key = heapq.heappop(_ttl_heap)
+        item = _memory_store.get(key)
+        if item and item[1] == expires_at:
+            del _memory_store[key]
 
 
 def set(key: str, value: str, ttl: int = 3600) -> None:
@@ -75,24 +84,66 @@ def set(key: str, value: str, ttl: int = 3600) -> None:
             # fall back to memory
             pass
     expires_at = (time.time() + ttl) if ttl else None
-    _memory_store[key] = (value, expires_at)
+    _memory_set(key, value, expires_at)
+
+
+def delete(key: str) -> None:
+    r = get_client()
+    if r:
+        try:
+            r.delete(key)
+        except Exception:
+            pass
+    with _memory_lock:
+        _memory_store.pop(key, None)
 
 
 # ---------- JSON convenience wrappers ----------
 
-def get_json(key: str) -> Optional[Any]:
-    raw = get(key)
+if orjson is not None:
+    def _json_dumps(value: Any) -> str:
+        # non-str dict keys are stringified, as json.dumps does
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+def _loads(raw: Optional[str]) -> Optional[Any]:
     if raw is None:
         return None
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except Exception:
         return None
 
 
+def get_json(key: str) -> Optional[Any]:
+    return _loads(get(key))
+
+
+def mget_json(keys: list[str]) -> list[Optional[Any]]:
+    """
+    get_json() for many keys in one Redis round-trip (MGET).
+    Results are in key order; missing or undecodable entries are None.
+    """
+    if not keys:
+        return []
+    r = get_client()
+    if r:
+        try:
+            return [_loads(raw) for raw in r.mget(keys)]
+        except Exception:
+            # fall through to memory on transient Redis errors
+            pass
+    return [_loads(_memory_get(k)) for k in keys]
+
+
 def set_json(key: str, value: Any, ttl: int = 3600) -> None:
     try:
-        raw = json.dumps(value)
+        raw = _json_dumps(value)
     except Exception:
         raw = str(value)
     set(key, raw, ttl=ttl)
@@ -10,12 +10,22 @@ All lookups are best-effort and safe-failing (return []).
 from __future__ import annotations
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .cache import get_json, set_json, cache_key
+try:
+    import ahocorasick  # optional; pyahocorasick
+except Exception:  # pragma: no cover
+    ahocorasick = None
+
+from .cache import get_json, mget_json, set_json, cache_key
 
 # ---- Config / toggles ----
 ENABLE_OSV = True
@@ -23,7 +33,11 @@ ENABLE_NVD = bool(os.getenv("NVD_API_KEY"))  # only if you set an API key
 ENABLE_CIRCL = True
 
 CACHE_TTL_SECONDS = int(os.getenv("CVE_CACHE_TTL", "86400"))  # 24h default
+# How long ETag/Last-Modified (plus the data they describe) are kept for
+# revalidating an expired entry with a conditional GET
+VALIDATOR_TTL_SECONDS = int(os.getenv("CVE_VALIDATOR_TTL", str(7 * 86400)))
 HTTP_TIMEOUT = float(os.getenv("CVE_HTTP_TIMEOUT", "6.0"))
+LOOKUP_WORKERS = int(os.getenv("CVE_LOOKUP_WORKERS", "8"))
 
 NVD_API_KEY = os.getenv("NVD_API_KEY")
 OSV_URL = "https://api.osv.dev/v1/query"
@@ -32,17 +46,145 @@ CIRCL_URL_TMPL = "https://cve.circl.lu/api/search/{vendor}/{product}"
 
 UA = {"User-Agent": "vulnscanner-cve/0.1 (+https://example.com)"}
 
+# One pooled session per worker process: connections to each provider are
+# kept alive and reused, so lookups skip the TCP + TLS handshake.
+_SESSION = requests.Session()
+_SESSION.headers.update(UA)
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=1, backoff_factor=0.2)),
+)
+
+
+# Cache hits loaded in bulk by prefetch_cache() for the scan in progress;
+# rebound (not mutated) on each prefetch, so readers never see a mix.
+_prefill: Dict[str, Any] = {}
+
+# Thread pool for provider lookups, shared by all scans in the worker process;
+# lookups only share _SESSION and the cache, both safe across threads.
+_LOOKUP_POOL: Optional[ThreadPoolExecutor] = None
+_LOOKUP_POOL_LOCK = threading.Lock()
+
+# Single-flight: cache keys being fetched right now -> Event set when done,
+# so concurrent misses on one key make a single provider request.
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
 
 def _cached(key: str, ttl: int, fetch_fn):
+    """
+    Return the cached result for key, or fetch and cache it. Empty results
+    ([] = no known CVEs) are cached like any other; fetch_fn returns None on
+    provider errors, which are not cached so the next scan retries.
+    Concurrent misses on the same key in this process share one fetch.
+    """
+    hit = _prefill.get(key)
+    if hit is not None:
+        return hit
     hit = get_json(key)
     if hit is not None:
         return hit
-    data = fetch_fn()
-    if data is not None:
-        set_json(key, data, ttl=ttl)
+
+    with _inflight_lock:
+        event = _inflight.get(key)
+        owner = event is None
+        if owner:
+            event = _inflight[key] = threading.Event()
+    if not owner:
+        # another thread is fetching this key; use its result (a failed
+        # fetch isn't cached, so that comes back as None)
+        event.wait(2 * HTTP_TIMEOUT + 1)  # request + one retry
+        return get_json(key)
+
+    try:
+        data = fetch_fn()
+        if data is not None:
+            set_json(key, data, ttl=ttl)
+        return data
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def _validator_key(key: str) -> str:
+    return f"{key}:validator"
+
+
+def _conditional_get(key: str, url: str, parse, headers: Optional[Dict[str, str]] = None, **kwargs):
+    """
+    GET url, revalidating against the ETag/Last-Modified remembered for key.
+    On 304 the previously parsed data is reused, so an unchanged payload is
+    neither downloaded nor parsed again. Returns None on errors.
+    """
+    prev = get_json(_validator_key(key)) or {}
+    headers = dict(headers or {})
+    if "data" in prev:
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+
+    r = _SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT, **kwargs)
+    if r.status_code == 304 and "data" in prev:
+        return prev["data"]
+    if r.status_code != 200:
+        return None
+
+    data = parse(r.json())
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if etag or last_modified:
+        set_json(
+            _validator_key(key),
+            {"etag": etag, "last_modified": last_modified, "data": data},
+            ttl=VALIDATOR_TTL_SECONDS,
+        )
     return data
 
 
+# ---------------- Cache keys ----------------
+
+def _osv_key(product: str, version: Optional[str]) -> str:
+    return cache_key("cve", "osv", product, version or "")
+
+
+def _nvd_query(product: str, version: Optional[str]) -> str:
+    return f"{product} {version}".strip() if version else product.strip()
+
+
+def _nvd_key(query: str) -> str:
+    return cache_key("cve", "nvd", query)
+
+
+def _circl_key(vendor: str, product: str) -> str:
+    return cache_key("cve", "circl", vendor, product)
+
+
+def prefetch_cache(candidates: List[Tuple[str, Optional[str]]]) -> None:
+    """
+    Load every cached provider result for these (product, version) candidates
+    with one MGET, so the lookups that follow don't each pay a Redis
+    round-trip. Keys mirror the ones the *_lookup functions use.
+    """
+    global _prefill
+    keys: List[str] = []
+    for product, version in candidates:
+        product = (product or "").strip()
+        version = version or None
+        if not product:
+            continue
+        if ENABLE_OSV:
+            keys.append(_osv_key(product, version))
+        if ENABLE_NVD and NVD_API_KEY:
+            keys.append(_nvd_key(_nvd_query(product, version)))
+        vendor = _guess_vendor(product) if ENABLE_CIRCL else None
+        if vendor:
+            keys.append(_circl_key(vendor, product.lower()))
+    keys = list(dict.fromkeys(keys))
+    _prefill = {k: v for k, v in zip(keys, mget_json(keys)) if v is not None}
+
+
 # ---------------- OSV ----------------
 
 def osv_lookup(product: str, version: Optional[str] = None) -> List[str]:
@@ -57,15 +199,15 @@ def osv_lookup(product: str, version: Optional[str] = None) -> List[str]:
     if not p:
         return []
 
-    key = cache_key("cve", "osv", p, version or "")
+    key = _osv_key(p, version)
     def _fetch():
         try:
             payload = {"query": p}
             if version:
                 payload["version"] = version
-            r = requests.post(OSV_URL, json=payload, headers=UA, timeout=HTTP_TIMEOUT)
+            r = _SESSION.post(OSV_URL, json=payload, timeout=HTTP_TIMEOUT)
             if r.status_code != 200:
-                return []
+                return None
             data = r.json() or {}
             cves: List[str] = []
             for v in data.get("vulns", []):
@@ -81,7 +223,7 @@ def osv_lookup(product: str, version: Optional[str] = None) -> List[str]:
                     cves.append(vid)
             return sorted(list(set(cves)))
         except Exception:
-            return []
+            return None
     return _cached(key, CACHE_TTL_SECONDS, _fetch) or []
 
 
@@ -95,27 +237,27 @@ def nvd_lookup(product: str, version: Optional[str] = None) -> List[str]:
     if not ENABLE_NVD or not NVD_API_KEY:
         return []
 
-    q = f"{product} {version}".strip() if version else product.strip()
+    q = _nvd_query(product, version)
     if not q:
         return []
 
-    key = cache_key("cve", "nvd", q)
+    key = _nvd_key(q)
+    def _parse(data):
+        data = data or {}
+        cves: List[str] = []
+        for item in data.get("vulnerabilities", []):
+            cve = item.get("cve", {}).get("id")
+            if isinstance(cve, str):
+                cves.append(cve)
+        return sorted(list(set(cves)))
+
     def _fetch():
         try:
             params = {"keywordSearch": q, "resultsPerPage": 50}
-            headers = {"apiKey": NVD_API_KEY, **UA}
-            r = requests.get(NVD_URL, params=params, headers=headers, timeout=HTTP_TIMEOUT)
-            if r.status_code != 200:
-                return []
-            data = r.json() or {}
-            cves: List[str] = []
-            for item in data.get("vulnerabilities", []):
-                cve = item.get("cve", {}).get("id")
-                if isinstance(cve, str):
-                    cves.append(cve)
-            return sorted(list(set(cves)))
+            headers = {"apiKey": NVD_API_KEY}
+            return _conditional_get(key, NVD_URL, _parse, headers=headers, params=params)
         except Exception:
-            return []
+            return None
     return _cached(key, CACHE_TTL_SECONDS, _fetch) or []
 
 
@@ -134,47 +276,82 @@ def circl_lookup(vendor: str, product: str) -> List[str]:
     if not v or not p:
         return []
 
-    key = cache_key("cve", "circl", v, p)
+    key = _circl_key(v, p)
+    def _parse(data):
+        data = data or []
+        cves = [row.get("id") for row in data if isinstance(row, dict) and isinstance(row.get("id"), str)]
+        # Normalize to CVE-*
+        cves = [c for c in cves if c.startswith("CVE-")]
+        return sorted(list(set(cves)))
+
     def _fetch():
         try:
             url = CIRCL_URL_TMPL.format(vendor=v, product=p)
-            r = requests.get(url, headers=UA, timeout=HTTP_TIMEOUT)
-            if r.status_code != 200:
-                return []
-            data = r.json() or []
-            cves = [row.get("id") for row in data if isinstance(row, dict) and isinstance(row.get("id"), str)]
-            # Normalize to CVE-*
-            cves = [c for c in cves if c.startswith("CVE-")]
-            return sorted(list(set(cves)))
+            return _conditional_get(key, url, _parse)
         except Exception:
-            return []
+            return None
     return _cached(key, CACHE_TTL_SECONDS, _fetch) or []
 
 
 # ------------- Orchestrator -------------
 
-def query_cves_for_product_version(product: str, version: Optional[str]) -> List[str]:
-    """
-    Call providers in order, merge, de-dup.
-    """
-    product = (product or "").strip()
-    version = (version or None) or None
-    if not product:
-        return []
-
-    out: List[str] = []
+def _provider_calls(product: str, version: Optional[str]) -> List[Tuple[Any, tuple]]:
+    """(lookup function, args) for every enabled provider for one candidate."""
+    calls: List[Tuple[Any, tuple]] = []
     # OSV first (good for OSS)
-    out.extend(osv_lookup(product, version))
+    if ENABLE_OSV:
+        calls.append((osv_lookup, (product, version)))
     # NVD (if enabled)
-    out.extend(nvd_lookup(product, version))
+    if ENABLE_NVD and NVD_API_KEY:
+        calls.append((nvd_lookup, (product, version)))
     # CIRCL with vendor heuristic
-    vendor = _guess_vendor(product)
+    vendor = _guess_vendor(product) if ENABLE_CIRCL else None
     if vendor:
-        out.extend(circl_lookup(vendor, product))
+        calls.append((circl_lookup, (vendor, product)))
+    return calls
+
+
+def _lookup_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for provider lookups, created on first use."""
+    global _LOOKUP_POOL
+    with _LOOKUP_POOL_LOCK:
+        if _LOOKUP_POOL is None:
+            _LOOKUP_POOL = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="cve-lookup")
+        return _LOOKUP_POOL
+
+
+def query_cves_for_candidates(candidates: List[Tuple[str, Optional[str]]]) -> List[List[str]]:
+    """
+    query_cves_for_product_version() for many candidates at once: every
+    provider lookup for every candidate runs concurrently on a shared pool.
+    Returns one merged, de-duped CVE list per candidate, in input order.
+    """
+    results: List[set] = [set() for _ in candidates]
+    futures: Dict[Any, int] = {}
+    pool = _lookup_pool()
+    for idx, (product, version) in enumerate(candidates):
+        product = (product or "").strip()
+        version = version or None
+        if not product:
+            continue
+        for fn, args in _provider_calls(product, version):
+            futures[pool.submit(fn, *args)] = idx
+
+    for fut in as_completed(futures):
+        try:
+            results[futures[fut]].update(fut.result())
+        except Exception:
+            pass
 
     # De-dup and sort
-    out = sorted(set(out))
-    return out
+    return [sorted(r) for r in results]
+
+
+def query_cves_for_product_version(product: str, version: Optional[str]) -> List[str]:
+    """
+    Call providers concurrently, merge, de-dup.
+    """
+    return query_cves_for_candidates([(product, version)])[0]
 
 
 _VENDOR_MAP = {
@@ -189,8 +366,23 @@ _VENDOR_MAP = {
 }
 
 
+# All vendor keywords in one automaton, so a product string is matched in a
+# single pass however large the map grows. Values carry the key's position in
+# _VENDOR_MAP to keep first-key-wins when several keywords match.
+_VENDOR_AC = None
+if ahocorasick is not None:
+    _VENDOR_AC = ahocorasick.Automaton()
+    for _idx, (_k, _v) in enumerate(_VENDOR_MAP.items()):
+        _VENDOR_AC.add_word(_k, (_idx, _v))
+    _VENDOR_AC.make_automaton()
+
+
+@lru_cache(maxsize=2048)
 def _guess_vendor(product: str) -> Optional[str]:
     p = (product or "").strip().lower()
+    if _VENDOR_AC is not None:
+        hits = [val for _, val in _VENDOR_AC.iter(p)]
+        return min(hits)[1] if hits else None
     for k, v in _VENDOR_MAP.items():
         if k in p:
             return v
@@ -1,8 +1,8 @@
 # apps/scans_app/utils/scanner.py
 """
 Legit lightweight scanner:
-- TCP connect scan of a small, safe port list
-- Minimal banner grab
+- TCP connect scan of a small, safe port list (one selector, no threads)
+- Minimal banner grab on the same connection
 - HTTP HEAD/GET for basic metadata + headers
 - TLS certificate info (days left, SANs, issuer)
 - Optional CVE suggestions via providers (best-effort, informational)
@@ -10,22 +10,40 @@ Legit lightweight scanner:
 All network activity is read-only & non-intrusive.
 """
 from __future__ import annotations
+import errno
+import selectors
+import threading
 import socket
 import ssl
 import re
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .cve_providers import query_cves_for_product_version
+try:
+    from selectolax.parser import HTMLParser  # optional; C HTML5 parser for <title>
+except Exception:  # pragma: no cover
+    HTMLParser = None
+
+try:
+    import hyperscan  # optional; multi-pattern matching over all banners at once
+except Exception:  # pragma: no cover
+    hyperscan = None
+
+from .cve_providers import prefetch_cache, query_cves_for_candidates
 
 # ---------- Config ----------
 TCP_TIMEOUT = 2.0
 HTTP_TIMEOUT = 5.0
-MAX_WORKERS = 12
+HTML_READ_LIMIT = 64 * 1024  # bytes of a page read to find its <title>
 HTTP_HEADERS = {"User-Agent": "vulnscanner-lite/0.1 (+https://example.com)"}
 
 TOP_PORTS_QUICK = [80, 443, 22, 21, 25, 3306, 445]
@@ -51,18 +69,49 @@ TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
 #   "Apache/2.4.57 (Ubuntu)"    -> ("Apache", "2.4.57")
 #   "OpenSSH_8.9p1 Ubuntu-3"    -> ("OpenSSH", "8.9p1")
 #   "gunicorn/19.9.0"           -> ("gunicorn", "19.9.0")
+_PRODUCT_SPECS = [
+    # (product, separator, version) in priority order
+    ("nginx",      r"[/\- ]", r"\d+(\.\d+){0,3}"),
+    ("apache",     r"[/\- ]", r"\d+(\.\d+){0,3}"),
+    ("httpd",      r"[/\- ]", r"\d+(\.\d+){0,3}"),
+    ("openssh",    r"[_/ ]",  r"\d+[^\s/]*"),
+    ("openssl",    r"[/\- ]", r"\d+(\.\d+){0,3}[a-z]?"),
+    ("gunicorn",   r"[/\- ]", r"\d+(\.\d+){0,3}"),
+    ("mysql",      r"[/\- ]", r"\d+(\.\d+){0,3}"),
+    ("postgresql", r"[/\- ]", r"\d+(\.\d+){0,3}"),
+]
 PRODUCT_PATTERNS = [
-    re.compile(r"(nginx)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
-    re.compile(r"(apache)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
-    re.compile(r"(httpd)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
-    re.compile(r"(openssh)[_/ ](?P<ver>\d+[^\s/]*)", re.I),
-    re.compile(r"(openssl)[/\- ](?P<ver>\d+(\.\d+){0,3}[a-z]?)", re.I),
-    re.compile(r"(gunicorn)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
-    re.compile(r"(mysql)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
-    re.compile(r"(postgresql)[/\- ](?P<ver>\d+(\.\d+){0,3})", re.I),
+    re.compile(rf"({name}){sep}(?P<ver>{ver})", re.I) for name, sep, ver in _PRODUCT_SPECS
 ]
 
-
+# All product patterns fused into one alternation, so a banner is scanned in
+# a single pass; group p<i>/v<i> belong to PRODUCT_PATTERNS[i]
+_PRODUCT_RE = re.compile(
+    "|".join(
+        rf"(?P<p{i}>{name}){sep}(?P<v{i}>{ver})" for i, (name, sep, ver) in enumerate(_PRODUCT_SPECS)
+    ),
+    re.I,
+)
+
+# The same patterns as one Hyperscan database (ids = PRODUCT_PATTERNS index).
+# Hyperscan reports which pattern matched where, not groups; the winning
+# pattern is re-run with `re` on its banner to read product and version.
+_HS_DB = None
+_HS_LOCK = threading.Lock()  # a database's scratch space is single-threaded
+if hyperscan is not None:
+    try:
+        _HS_DB = hyperscan.Database()
+        _HS_DB.compile(
+            expressions=[f"{name}{sep}{ver}".encode() for name, sep, ver in _PRODUCT_SPECS],
+            ids=list(range(len(_PRODUCT_SPECS))),
+            elements=len(_PRODUCT_SPECS),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_PRODUCT_SPECS),
+        )
+    except Exception:  # pragma: no cover
+        _HS_DB = None
+
+
+@lru_cache(maxsize=2048)
 def _normalize_target(target: str) -> Tuple[str, str]:
     t = target.strip()
     if t.startswith(("http://", "https://")):
@@ -73,43 +122,71 @@ def _normalize_target(target: str) -> Tuple[str, str]:
     return t, f"http://{t}"
 
 
-def _tcp_connect(host: str, port: int, timeout: float = TCP_TIMEOUT) -> bool:
+def _html_title(html: str) -> Optional[str]:
+    """Whitespace-collapsed <title> text, or None when the page has no title."""
+    if HTMLParser is not None:
+        node = HTMLParser(html).css_first("title")
+        if node is None:
+            return None
+        title = node.text()
+    else:
+        m = TITLE_RE.search(html)
+        if not m:
+            return None
+        title = m.group(1)
+    return re.sub(r"\s+", " ", title.strip())
+
+
+# One pooled session per worker process, so HTTP probes reuse keep-alive
+# connections within a scan and across scans. Probes are stateless: the
+# policy below keeps cookies from one target out of later requests.
+_HTTP = requests.Session()
+_HTTP.headers.update(HTTP_HEADERS)
+_HTTP.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+
+# Unverified twin of _HTTP for the plain-HTTP fallback, with its own warm
+# pool, so no per-request verify= override is needed
+_HTTP_INSECURE = requests.Session()
+_HTTP_INSECURE.headers.update(HTTP_HEADERS)
+_HTTP_INSECURE.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_HTTP_INSECURE.verify = False
+_HTTP_INSECURE_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+_HTTP_INSECURE.mount("http://", _HTTP_INSECURE_ADAPTER)
+_HTTP_INSECURE.mount("https://", _HTTP_INSECURE_ADAPTER)
+
+# Built once: loading the system CA store for every TLS check is wasted work
+_TLS_CTX = ssl.create_default_context()
+
+
+def _read_html_head(resp: requests.Response, limit: int = HTML_READ_LIMIT) -> str:
+    """
+    Decoded text of at most the first `limit` bytes of a streamed response,
+    then close it. The title sits in <head>, so large pages are not
+    downloaded in full; a body read to the end keeps its pooled connection.
+    """
+    buf = bytearray()
     try:
-        with socket.create_connection((host, port), timeout=timeout):
-            return True
-    except Exception:
-        return False
+        for chunk in resp.iter_content(chunk_size=16 * 1024):
+            buf += chunk
+            if len(buf) >= limit:
+                break
+    finally:
+        resp.close()
+    return bytes(buf[:limit]).decode(resp.encoding or "utf-8", errors="ignore")
 
 
-def _banner_grab(host: str, port: int, timeout: float = TCP_TIMEOUT) -> Optional[str]:
+def _robots_present(session: requests.Session, base_url: str) -> Optional[bool]:
+    robots_url = base_url.rstrip("/") + "/robots.txt"
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(timeout)
-        s.connect((host, port))
-        try:
-            s.sendall(b"\r\n")
-        except Exception:
-            pass
-        data = b""
-        try:
-            data = s.recv(1024)
-        except Exception:
-            pass
-        finally:
-            s.close()
-        if not data:
-            return None
-        return data.decode(errors="ignore").strip()
+        rr = session.get(robots_url, timeout=HTTP_TIMEOUT, verify=True)
+        return rr.status_code == 200
     except Exception:
         return None
 
 
-def _http_session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(HTTP_HEADERS)
-    return s
-
-
 def _http_basic_checks(session: requests.Session, base_url: str) -> Dict[str, Any]:
     out: Dict[str, Any] = {
         "status": None,
@@ -131,21 +208,16 @@ def _http_basic_checks(session: requests.Session, base_url: str) -> Dict[str, An
 
         need_get = (out["status"] is None) or ("text/html" in (r.headers.get("Content-Type", "") or "").lower())
         if need_get:
-            g = session.get(base_url, allow_redirects=True, timeout=HTTP_TIMEOUT, verify=True)
-            out["status"] = g.status_code
-            out["server"] = out["server"] or g.headers.get("Server")
-            html = g.text or ""
-            m = TITLE_RE.search(html)
-            if m:
-                out["title"] = re.sub(r"\s+", " ", m.group(1).strip())
-
-            # robots.txt presence
-            robots_url = base_url.rstrip("/") + "/robots.txt"
-            try:
-                rr = session.get(robots_url, timeout=HTTP_TIMEOUT, verify=True)
-                out["robots"] = (rr.status_code == 200)
-            except Exception:
-                out["robots"] = None
+            # robots.txt presence, fetched on a helper thread while the page loads
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                robots_fut = pool.submit(_robots_present, session, base_url)
+                g = session.get(base_url, allow_redirects=True, timeout=HTTP_TIMEOUT, verify=True, stream=True)
+                out["status"] = g.status_code
+                out["server"] = out["server"] or g.headers.get("Server")
+                title = _html_title(_read_html_head(g))
+                if title is not None:
+                    out["title"] = title
+                out["robots"] = robots_fut.result()
 
             # Set-Cookie flags (crude)
             set_cookie_headers = g.headers.get("Set-Cookie", "")
@@ -161,13 +233,12 @@ def _http_basic_checks(session: requests.Session, base_url: str) -> Dict[str, An
         if base_url.startswith("https://"):
             try:
                 http_url = "http://" + base_url.split("://", 1)[1]
-                g = session.get(http_url, allow_redirects=True, timeout=HTTP_TIMEOUT, verify=False)
+                g = _HTTP_INSECURE.get(http_url, allow_redirects=True, timeout=HTTP_TIMEOUT, stream=True)
                 out["status"] = g.status_code
                 out["server"] = out["server"] or g.headers.get("Server")
-                html = g.text or ""
-                m = TITLE_RE.search(html)
-                if m:
-                    out["title"] = re.sub(r"\s+", " ", m.group(1).strip())
+                title = _html_title(_read_html_head(g))
+                if title is not None:
+                    out["title"] = title
             except Exception:
                 pass
     except Exception:
@@ -176,24 +247,57 @@ def _http_basic_checks(session: requests.Session, base_url: str) -> Dict[str, An
     return out
 
 
-def _tls_cert_info(host: str, port: int = 443, timeout: float = TCP_TIMEOUT) -> Optional[Dict[str, Any]]:
+_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+
+def _parse_cert_time(x: Optional[str]) -> Optional[datetime]:
+    """
+    Parse getpeercert() times such as "Jun  1 12:00:00 2025 GMT" by hand;
+    the format is fixed, and strptime is comparatively slow.
+    """
+    if not x:
+        return None
     try:
-        ctx = ssl.create_default_context()
-        with ctx.wrap_socket(socket.socket(socket.AF_INET), server_hostname=host) as s:
-            s.settimeout(timeout)
-            s.connect((host, port))
-            cert = s.getpeercert()
-
-        def _parse_dt(x: Optional[str]) -> Optional[datetime]:
-            if not x:
-                return None
-            try:
-                return datetime.strptime(x, "%b %d %H:%M:%S %Y %Z").replace(tzinfo=timezone.utc)
-            except Exception:
-                return None
+        mon, day, hms, year, _tz = x.split()
+        h, m, sec = hms.split(":")
+        return datetime(int(year), _MONTHS[mon], int(day), int(h), int(m), int(sec), tzinfo=timezone.utc)
+    except Exception:
+        return None
+
+
+def _peer_cert(host: str, port: int, timeout: float, sock: Optional[socket.socket] = None) -> Dict[str, Any]:
+    """
+    TLS handshake and return the verified peer certificate. `sock` is an
+    already connected TCP socket to use instead of opening a new one; it
+    is closed either way.
+    """
+    if sock is None:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    else:
+        sock.settimeout(timeout)
+    with _TLS_CTX.wrap_socket(sock, server_hostname=host) as s:
+        return s.getpeercert()
+
 
-        not_before = _parse_dt(cert.get("notBefore"))
-        not_after = _parse_dt(cert.get("notAfter"))
+def _tls_cert_info(
+    host: str, port: int = 443, timeout: float = TCP_TIMEOUT, sock: Optional[socket.socket] = None
+) -> Optional[Dict[str, Any]]:
+    try:
+        try:
+            cert = _peer_cert(host, port, timeout, sock)
+        except ssl.SSLCertVerificationError:
+            raise
+        except OSError:
+            if sock is None:
+                raise
+            # the held connection went stale (e.g. server idle timeout); retry fresh
+            cert = _peer_cert(host, port, timeout)
+
+        not_before = _parse_cert_time(cert.get("notBefore"))
+        not_after = _parse_cert_time(cert.get("notAfter"))
         now = datetime.now(timezone.utc)
 
         days_left = None
@@ -219,6 +323,7 @@ def _tls_cert_info(host: str, port: int = 443, timeout: float = TCP_TIMEOUT) ->
         return None
 
 
+@lru_cache(maxsize=2048)  # same banners/Server headers recur across scans
 def _extract_product_version(text: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
     """
     Try several patterns to find (product, version) in banners / server headers.
@@ -226,12 +331,18 @@ def _extract_product_version(text: Optional[str]) -> Optional[Tuple[str, Optiona
     if not text:
         return None
     t = text.strip()
-    for pat in PRODUCT_PATTERNS:
-        m = pat.search(t)
-        if m:
-            prod = m.group(1)
-            ver = m.group("ver")
-            return (prod, ver)
+    # One pass over the banner; when several products appear, the one
+    # listed first in PRODUCT_PATTERNS wins (as with trying them in order)
+    best = None
+    for m in _PRODUCT_RE.finditer(t):
+        idx = int(m.lastgroup[1:])
+        if best is None or idx < best[0]:
+            best = (idx, m)
+            if idx == 0:
+                break
+    if best:
+        idx, m = best
+        return (m.group(f"p{idx}"), m.group(f"v{idx}"))
     # Fallback: product without version
     tokens = re.split(r"[ /()_;\-]", t)
     for tok in tokens:
@@ -240,17 +351,171 @@ def _extract_product_version(text: Optional[str]) -> Optional[Tuple[str, Optiona
     return None
 
 
-def _scan_port_worker(host: str, port: int) -> Dict[str, Any]:
-    state = "open" if _tcp_connect(host, port) else "closed"
-    banner = _banner_grab(host, port) if state == "open" else None
+def _extract_products(texts: List[Optional[str]]) -> List[Optional[Tuple[str, Optional[str]]]]:
+    """
+    _extract_product_version() for every text, in order. With Hyperscan all
+    texts are matched against all product patterns in a single scan call.
+    """
+    if _HS_DB is None or not texts:
+        return [_extract_product_version(t) for t in texts]
+
+    stripped = [(t or "").strip() for t in texts]
+    encoded = [t.encode() for t in stripped]
+    starts: List[int] = []
+    pos = 0
+    for b in encoded:
+        starts.append(pos)
+        pos += len(b) + 1  # NUL separator
+
+    # text index -> lowest matching pattern id (earlier patterns win)
+    best: Dict[int, int] = {}
+
+    def on_match(pattern_id, start, end, flags, context):
+        idx = bisect_right(starts, start) - 1
+        if pattern_id < best.get(idx, len(_PRODUCT_SPECS)):
+            best[idx] = pattern_id
+
+    with _HS_LOCK:
+        _HS_DB.scan(b"\0".join(encoded), match_event_handler=on_match)
+
+    out: List[Optional[Tuple[str, Optional[str]]]] = []
+    for idx, text in enumerate(stripped):
+        pattern_id = best.get(idx)
+        m = PRODUCT_PATTERNS[pattern_id].search(text) if pattern_id is not None else None
+        # no (or a separator-straddling) hit: regular path, incl. its fallback
+        out.append((m.group(1), m.group("ver")) if m else _extract_product_version(texts[idx]))
+    return out
+
+
+def _port_entry(port: int) -> Dict[str, Any]:
     return {
         "port": port,
         "service": PORT_SERVICE.get(port, "unknown"),
-        "state": state,
-        "banner": banner
+        "state": "closed",
+        "banner": None
     }
 
 
+def _scan_ports(
+    host: str, ports: List[int], timeout: float = TCP_TIMEOUT, hold_open: Tuple[int, ...] = ()
+) -> Tuple[List[Dict[str, Any]], Dict[int, socket.socket]]:
+    """
+    TCP connect scan of all ports at once on non-blocking sockets, multiplexed
+    with a single selector (epoll on Linux) instead of a thread per port.
+
+    Each port gets `timeout` seconds to connect; an open port's connected
+    socket is reused for the banner grab (send CRLF, read up to 1 KiB within
+    another `timeout`), so every port costs at most one handshake.
+
+    Open ports listed in `hold_open` skip the banner grab and their connected
+    sockets are returned (port -> socket) for a follow-up protocol exchange,
+    e.g. the TLS handshake on 443. The caller must close them.
+    """
+    results = {port: _port_entry(port) for port in ports}
+    held: Dict[int, socket.socket] = {}
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except OSError:
+        return list(results.values()), held
+
+    # IPv4 first: dual-stack names often list an AAAA record the scanner
+    # host has no route to. Further addresses are only tried while every
+    # port so far timed out or was unreachable.
+    infos.sort(key=lambda info: info[0] != socket.AF_INET)
+    seen = set()
+    for family, _, _, _, sockaddr in infos:
+        if sockaddr[0] in seen:
+            continue
+        seen.add(sockaddr[0])
+        if _sweep_address(family, sockaddr, ports, timeout, hold_open, results, held):
+            break
+    return list(results.values()), held
+
+
+def _sweep_address(
+    family: int,
+    sockaddr: Tuple[Any, ...],
+    ports: List[int],
+    timeout: float,
+    hold_open: Tuple[int, ...],
+    results: Dict[int, Dict[str, Any]],
+    held: Dict[int, socket.socket],
+) -> bool:
+    """
+    One _scan_ports() sweep of a resolved address, recording into `results`
+    and `held`. Returns True if the host answered on any port (connected or
+    refused), False if every attempt timed out or was unreachable.
+    """
+    answered = False
+    sel = selectors.DefaultSelector()
+    deadlines: Dict[socket.socket, float] = {}
+    try:
+        start = time.monotonic()
+        for port in ports:
+            try:
+                s = socket.socket(family, socket.SOCK_STREAM)
+            except OSError:  # address family unsupported here, e.g. no IPv6
+                return False
+            s.setblocking(False)
+            err = s.connect_ex((sockaddr[0], port, *sockaddr[2:]))
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                answered = answered or err == errno.ECONNREFUSED
+                s.close()
+                continue
+            sel.register(s, selectors.EVENT_WRITE, port)
+            deadlines[s] = start + timeout
+
+        while deadlines:
+            now = time.monotonic()
+            for s in [s for s, d in deadlines.items() if d <= now]:
+                # connect or banner read timed out; state stays as recorded
+                del deadlines[s]
+                sel.unregister(s)
+                s.close()
+            if not deadlines:
+                break
+
+            for key, events in sel.select(min(deadlines.values()) - now):
+                s, port = key.fileobj, key.data
+                if events & selectors.EVENT_WRITE:
+                    err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    answered = answered or err in (0, errno.ECONNREFUSED)
+                    if err != 0:
+                        del deadlines[s]
+                        sel.unregister(s)
+                        s.close()
+                        continue
+                    results[port]["state"] = "open"
+                    if port in hold_open:
+                        del deadlines[s]
+                        sel.unregister(s)
+                        s.setblocking(True)
+                        held[port] = s
+                        continue
+                    try:
+                        s.send(b"\r\n")
+                    except OSError:
+                        pass
+                    sel.modify(s, selectors.EVENT_READ, port)
+                    deadlines[s] = time.monotonic() + timeout
+                else:
+                    try:
+                        data = s.recv(1024)
+                    except OSError:
+                        data = b""
+                    if data:
+                        results[port]["banner"] = data.decode(errors="ignore").strip() or None
+                    del deadlines[s]
+                    sel.unregister(s)
+                    s.close()
+    finally:
+        for s in deadlines:
+            s.close()
+        sel.close()
+
+    return answered
+
+
 # ---------- Public API (used by tasks.py) ----------
 
 def run_scan(scan_id: int, target: str, mode: str) -> Dict[str, Any]:
@@ -261,71 +526,76 @@ def run_scan(scan_id: int, target: str, mode: str) -> Dict[str, Any]:
       - tls_info:   {issuer, subject, sans, valid_from, valid_to, days_left, valid}
       - vulnerabilities: [ {severity, name, path, description, impact, remediation, reference_links} ]
     """
+    return dict(run_scan_stream(scan_id, target, mode))
+
+
+def run_scan_stream(scan_id: int, target: str, mode: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Same scan as run_scan(), yielding each (key, value) of its result as
+    soon as it is ready: open_ports, http_info, tls_info, then
+    vulnerabilities. The CVE lookups behind the last one are the slow bit;
+    a consumer can act on (or stop before) them.
+    """
     host, base_url = _normalize_target(target)
     ports = TOP_PORTS_QUICK if mode == "quick" else TOP_PORTS_FULL
 
-    # 1) Port scan
-    open_ports: List[Dict[str, Any]] = []
-    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, max(1, len(ports)))) as pool:
-        futures = {pool.submit(_scan_port_worker, host, p): p for p in ports}
-        for fut in as_completed(futures):
-            open_ports.append(fut.result())
-
-    # 2) HTTP checks
-    http_info: Dict[str, Any] = {}
-    try:
-        has_http = any(p["port"] == 80 and p["state"] == "open" for p in open_ports)
-        has_https = any(p["port"] == 443 and p["state"] == "open" for p in open_ports)
-        if has_https:
-            base = base_url if base_url.startswith("https://") else "https://" + host
-        elif has_http:
-            base = base_url if base_url.startswith("http://") else "http://" + host
-        else:
-            base = None
-
-        if base:
-            with _http_session() as sess:
-                http_info = _http_basic_checks(sess, base)
-    except Exception:
-        http_info = {}
+    # 1) Port scan; the 443 connection is kept for the TLS handshake
+    open_ports, held = _scan_ports(host, ports, hold_open=(443,))
+    tls_sock = held.pop(443, None)
 
-    # 3) TLS cert info
-    tls_info = _tls_cert_info(host, 443) if any(p["port"] == 443 and p["state"] == "open" for p in open_ports) else {}
+    # 2) TLS cert info on a helper thread, started right away so the held
+    #    connection isn't left idle, while 3) the HTTP checks run here
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        tls_fut = pool.submit(_tls_cert_info, host, 443, sock=tls_sock) if tls_sock is not None else None
+        yield "open_ports", open_ports
 
-    # 4) CVE suggestions (best-effort)
-    # Collect product/version candidates from banners & server header
-    candidates: List[Tuple[str, Optional[str]]] = []
+        # 3) HTTP checks
+        http_info: Dict[str, Any] = {}
+        try:
+            has_http = any(p["port"] == 80 and p["state"] == "open" for p in open_ports)
+            has_https = any(p["port"] == 443 and p["state"] == "open" for p in open_ports)
+            if has_https:
+                base = base_url if base_url.startswith("https://") else "https://" + host
+            elif has_http:
+                base = base_url if base_url.startswith("http://") else "http://" + host
+            else:
+                base = None
+
+            if base:
+                http_info = _http_basic_checks(_HTTP, base)
+        except Exception:
+            http_info = {}
+        yield "http_info", http_info
 
-    # From port banners
-    for p in open_ports:
-        if p.get("banner"):
-            pv = _extract_product_version(p["banner"])
-            if pv:
-                candidates.append(pv)
+        tls_info = tls_fut.result() if tls_fut is not None else {}
+        yield "tls_info", tls_info or {}
 
-    # From HTTP server header
+    # 4) CVE suggestions (best-effort)
+    # Collect product/version candidates from port banners, then the
+    # HTTP server header
+    texts = [p["banner"] for p in open_ports if p.get("banner")]
     if http_info.get("server"):
-        pv = _extract_product_version(http_info["server"])
-        if pv:
-            candidates.append(pv)
+        texts.append(http_info["server"])
+    candidates = [pv for pv in _extract_products(texts) if pv]
 
-    # Deduplicate (product,version)
-    seen = set()
-    unique_candidates: List[Tuple[str, Optional[str]]] = []
+    # Deduplicate (product,version) case-insensitively, first spelling wins
+    by_key: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
     for prod, ver in candidates:
-        k = (prod.lower(), (ver or "").lower())
-        if k not in seen:
-            seen.add(k)
-            unique_candidates.append((prod, ver))
+        by_key.setdefault((prod.lower(), (ver or "").lower()), (prod, ver))
+    unique_candidates = list(by_key.values())
 
     # Query providers and build informational findings (only in full mode)
     vulnerabilities: List[Dict[str, Any]] = []
     if mode == "full":
-        for prod, ver in unique_candidates:
-            try:
-                cves = query_cves_for_product_version(prod, ver)
-            except Exception:
-                cves = []
+        try:
+            prefetch_cache(unique_candidates)
+        except Exception:
+            pass
+        try:
+            cve_lists = query_cves_for_candidates(unique_candidates)
+        except Exception:
+            cve_lists = [[] for _ in unique_candidates]
+        for (prod, ver), cves in zip(unique_candidates, cve_lists):
             for cve in cves:
                 vulnerabilities.append({
                     "severity": "low",  # policy: CVE hint = low until confirmed/version precise
@@ -341,9 +611,4 @@ def run_scan(scan_id: int, target: str, mode: str) -> Dict[str, Any]:
                     "reference_links": [f"https://cve.mitre.org/cgi-bin/cvename.cgi?name={cve}"],
                 })
 
-    return {
-        "open_ports": open_ports,
-        "http_info": http_info,
-        "tls_info": tls_info or {},
-        "vulnerabilities": vulnerabilities,
-    }
+    yield "vulnerabilities", vulnerabilities
@@ -21,17 +21,18 @@ Security Features:
 
 #--
 # apps/scans_app/views.py
+from datetime import datetime
+from itertools import islice
 from urllib.parse import urlparse
+import base64
 import ipaddress
-from collections import Counter
-from datetime import timedelta
+import re
 
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse, JsonResponse
-from django.template.loader import render_to_string
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 import django.db.models as djm
-from weasyprint import HTML
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -46,7 +47,35 @@ from .serializers import (
     ReportSerializer,
 )
 from apps.auth_app.authentication import CookieJWTAuthentication as JWTAuthentication
-from .tasks import run_scan_task
+from .reports import (
+    REPORT_CACHE_TTL,
+    REPORT_SYNC_MAX_VULNS,
+    SEVERITY_ORDER,
+    build_report_context,
+    format_duration,
+    render_report_html,
+    render_report_pdf,
+    report_cache_key,
+    report_storage,
+    report_pdf_name,
+    store_report_pdf,
+    user_display_name,
+)
+from .tasks import (
+    REPORT_PDF_FAILED,
+    REPORT_PDF_PENDING,
+    REPORT_PDF_PENDING_TTL,
+    most_common_vulns_cache_key,
+    render_report_pdf_task,
+    report_pdf_pending_cache_key,
+    run_scan_task,
+)
+from .utils import cache
+
+try:
+    import orjson  # optional; C encoder for the streamed JSON report
+except Exception:  # pragma: no cover
+    orjson = None
 
 
 class AuthenticatedView(APIView):
@@ -61,6 +90,14 @@ class AuthenticatedView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
+# Characters of IPv4/IPv6 addresses and networks (with optional IPv6
+# scope id); a cheap precheck before the ipaddress parsers
+_IP_CHARS_RE = re.compile(r"[0-9A-Fa-f:.]+(?:%[^/]+)?(?:/[0-9A-Fa-f:.]+)?\Z")
+# Schemes accepted for URL targets (urlparse strips leading C0/space
+# characters and lowercases the scheme)
+_URL_SCHEME_RE = re.compile(r"[\x00-\x20]*https?:", re.IGNORECASE)
+
+
 def _is_valid_target(target: str) -> bool:
     """
     Validate scan target format.
@@ -80,28 +117,25 @@ def _is_valid_target(target: str) -> bool:
     if not target or len(target) > 255:
         return False
 
-    # CIDR (contains slash)
-    try:
-        if "/" in target:
-            ipaddress.ip_network(target, strict=False)
+    # Only strings made of address characters can be an IP or CIDR; the
+    # rest skip the ipaddress parsers (and their ValueError) entirely
+    if _IP_CHARS_RE.match(target):
+        try:
+            if "/" in target:
+                ipaddress.ip_network(target, strict=False)
+            else:
+                ipaddress.ip_address(target)
             return True
-    except ValueError:
-        pass
-
-    # IP address
-    try:
-        ipaddress.ip_address(target)
-        return True
-    except ValueError:
-        pass
+        except ValueError:
+            pass
 
     # URL with scheme + host
-    try:
-        parsed = urlparse(target)
-        if parsed.scheme in ("http", "https") and parsed.netloc:
-            return True
-    except Exception:
-        pass
+    if _URL_SCHEME_RE.match(target):
+        try:
+            if urlparse(target).netloc:
+                return True
+        except ValueError:  # e.g. malformed IPv6 literal
+            pass
 
     # Plain hostname (best-effort)
     if "." in target and " " not in target:
@@ -110,34 +144,73 @@ def _is_valid_target(target: str) -> bool:
     return False
 
 
-def _scan_summary_for_list(scan: Scan):
+# Upper bound on ?limit= for the scan list, so one request can't pull a
+# user's entire history into memory
+SCAN_LIST_MAX_LIMIT = 100
+
+
+def _encode_scan_cursor(created_at, scan_id) -> str:
+    """
+    Opaque ?cursor= value pointing just past the given scan in the list
+    order (newest first, id breaking ties).
+    """
+    raw = f"{created_at.isoformat()},{scan_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_scan_cursor(cursor: str):
+    """
+    Inverse of _encode_scan_cursor(): (created_at, id), or None if the
+    cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, scan_id = raw.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), int(scan_id)
+    except ValueError:  # also covers binascii.Error, UnicodeDecodeError
+        return None
+
+# Columns read by _scan_summary_for_list(), in the order it unpacks them;
+# the list query fetches only these
+_SCAN_LIST_COLUMNS = (
+    "id", "target", "mode", "status", "progress", "created_at",
+    "duration_seconds",
+    "critical_count", "high_count", "medium_count", "low_count", "info_count",
+)
+
+
+def _scan_summary_for_list(row: tuple):
     """
     Generate summary data for scan list responses.
     
     Args:
-        scan (Scan): Scan instance to summarize
+        row (tuple): Scan columns from .values_list(*_SCAN_LIST_COLUMNS)
         
     Returns:
         dict: Formatted scan summary for list views
     """
+    (scan_id, target, mode, scan_status, progress, created_at, secs,
+     critical, high, medium, low, info) = row
     base = {
-        "scanId": f"s_{scan.id}",
-        "target": scan.target,
-        "mode": scan.mode,
-        "status": scan.status,
-        "createdAt": scan.created_at.isoformat(),
+        "scanId": f"s_{scan_id}",
+        "target": target,
+        "mode": mode,
+        "status": scan_status,
+        "createdAt": created_at.isoformat(),
     }
-    if scan.status == "completed" and hasattr(scan, "report") and scan.report:
+    if scan_status == "completed":
         base["summary"] = {
-            "critical": scan.report.critical,
-            "high": scan.report.high,
-            "medium": scan.report.medium,
-            "low": scan.report.low,
-            "info": scan.report.info,
+            "critical": critical,
+            "high": high,
+            "medium": medium,
+            "low": low,
+            "info": info,
         }
-        base["duration"] = scan.report.duration
-    elif scan.status == "running":
-        base["progress"] = scan.progress
+        # JSON clients get null for an unknown duration; format_duration()'s
+        # "—" placeholder is only for rendered reports
+        base["duration"] = format_duration(secs) if secs is not None else None
+    elif scan_status == "running":
+        base["progress"] = progress
     return base
 
 
@@ -216,21 +289,43 @@ class ScanListCreateView(AuthenticatedView):
         """
         Retrieve user's scan history.
         
-        Supports pagination and filtering by status and mode.
+        Supports pagination (?cursor=, or ?offset=) and filtering by
+        status and mode.
         """
-        limit = int(request.query_params.get("limit", 10))
-        offset = int(request.query_params.get("offset", 0))
+        limit = min(max(int(request.query_params.get("limit", 10)), 0), SCAN_LIST_MAX_LIMIT)
+        offset = max(int(request.query_params.get("offset", 0)), 0)
         status_filter = request.query_params.get("status")
         mode_filter = request.query_params.get("mode")
 
-        qs = Scan.objects.filter(user=request.user).order_by("-created_at")
+        cursor = request.query_params.get("cursor")
+
+        qs = Scan.objects.filter(user=request.user).order_by("-created_at", "-id")
         if status_filter in {"queued", "running", "completed", "failed", "canceled"}:
             qs = qs.filter(status=status_filter)
         if mode_filter in {"quick", "full"}:
             qs = qs.filter(mode=mode_filter)
 
-        scans = qs[offset : offset + limit]
-        return Response({"scans": [_scan_summary_for_list(s) for s in scans]}, status=200)
+        # Keyset pagination: ?cursor= resumes after the last scan of the
+        # previous page with an index range scan, where a deep ?offset=
+        # makes Postgres read and discard every skipped row
+        if cursor:
+            position = _decode_scan_cursor(cursor)
+            if position is None:
+                return Response({"error": {"code": 400, "message": "Invalid cursor"}}, status=400)
+            created_at, scan_id = position
+            qs = qs.filter(
+                djm.Q(created_at__lt=created_at) | djm.Q(created_at=created_at, id__lt=scan_id)
+            )
+            offset = 0
+
+        # Plain tuple rows of the summary columns: no model instances, no
+        # serializer fields; severity counters live on Scan, so no joins
+        rows = list(qs.values_list(*_SCAN_LIST_COLUMNS)[offset : offset + limit])
+        data = {"scans": [_scan_summary_for_list(r) for r in rows]}
+        if limit and len(rows) == limit:
+            last = rows[-1]
+            data["nextCursor"] = _encode_scan_cursor(last[5], last[0])  # created_at, id
+        return Response(data, status=200)
 
 
 class ScanDetailView(AuthenticatedView):
@@ -291,7 +386,7 @@ class ScanResultView(AuthenticatedView):
         """
         Get detailed technical scan results.
         """
-        scan = get_object_or_404(Scan, id=scan_id, user=request.user)
+        scan = get_object_or_404(Scan.objects.select_related("result"), id=scan_id, user=request.user)
         if scan.status != "completed":
             return Response(
                 {"detail": f"Scan is {scan.status}. Results available after completion."},
@@ -312,45 +407,131 @@ class ScanResultView(AuthenticatedView):
         return Response(data, status=status.HTTP_200_OK)
 
 
-# Helper functions for report generation
-def _dur_str(start, end):
+class ScanReportView(AuthenticatedView):
     """
-    Return a short human-readable duration (e.g. '1 min 22 sec').
+    Retrieve the vulnerability report of a completed scan.
+
+    Returns the severity summary stored on the scan plus every finding,
+    most severe first, with its reference URLs.
     """
-    try:
-        if not start or not end:
-            return "—"
-        if isinstance(start, str):
-            start = timezone.datetime.fromisoformat(start.replace("Z", "+00:00"))
-        if isinstance(end, str):
-            end = timezone.datetime.fromisoformat(end.replace("Z", "+00:00"))
-        delta: timedelta = end - start
-        secs = max(0, int(delta.total_seconds()))
-        return f"{secs // 60} min {secs % 60} sec"
-    except Exception:
-        return "—"
-
-
-def _sev_summary(vulns):
+
+    def get(self, request, scan_id: int):
+        """
+        Get the scan's severity summary and vulnerabilities.
+        """
+        scan = get_object_or_404(Scan, id=scan_id, user=request.user)
+        if scan.status != "completed":
+            return Response(
+                {"detail": f"Scan is {scan.status}. Report available after completion."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        vulns = (
+            scan.vulnerabilities.defer("evidence")
+            .order_by(SEVERITY_ORDER, "name")
+            .prefetch_related("references")
+        )
+        data = {
+            "scanId": f"s_{scan.id}",
+            "target": scan.target,
+            "mode": scan.mode,
+            "status": scan.status,
+            "summary": {
+                "total": scan.total_vulns,
+                "critical": scan.critical_count,
+                "high": scan.high_count,
+                "medium": scan.medium_count,
+                "low": scan.low_count,
+                "info": scan.info_count,
+                "duration": format_duration(scan.duration_seconds),
+            },
+            "vulnerabilities": [
+                {
+                    "id": f"vuln_{v.id}",
+                    "severity": v.severity,
+                    "name": v.name,
+                    "path": v.path,
+                    "description": v.description,
+                    "impact": v.impact,
+                    "remediation": v.remediation,
+                    "references": v.reference_links,
+                    "status": v.status,
+                }
+                for v in vulns
+            ],
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Helper functions for report generation
+def _buffered(parts, size=64 * 1024):
     """
-    Aggregate counts by severity.
+    Join small string fragments into ~size-character chunks for streaming.
     """
-    summary = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
-    for v in vulns:
-        sev = (v.get("severity") or "info").lower()
-        summary[sev] = summary.get(sev, 0) + 1
-    summary["total"] = sum(summary.values())
-    return summary
+    buf, n = [], 0
+    for part in parts:
+        buf.append(part)
+        n += len(part)
+        if n >= size:
+            yield "".join(buf)
+            buf, n = [], 0
+    if buf:
+        yield "".join(buf)
 
 
-def _pct(n, total):
+# Items encoded per call when streaming a list (e.g. the findings)
+JSON_STREAM_ITEMS = 500
+
+
+def _json_chunks(value):
     """
-    Calculate percentage safely.
+    Encode `value` as JSON in fragments: dicts are walked key by key and
+    lists (or other iterables, such as LazyReportVulns) encoded
+    JSON_STREAM_ITEMS items per call, so no single encode covers the whole
+    report. Uses orjson where installed; datetimes go through
+    DjangoJSONEncoder either way, so values encode the same.
     """
-    try:
-        return 0 if not total else round(n * 100 / total)
-    except Exception:
-        return 0
+    if orjson is None:
+        dumps = DjangoJSONEncoder().encode
+    else:
+        default = DjangoJSONEncoder().default
+
+        def dumps(v):
+            return orjson.dumps(v, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+    return _walk_json(value, dumps)
+
+
+def _is_lazy(value):
+    """Iterable that isn't a JSON container/string (e.g. LazyReportVulns)."""
+    return hasattr(value, "__iter__") and not isinstance(value, (str, bytes, dict, list, tuple))
+
+
+def _walk_json(value, dumps):
+    if isinstance(value, dict):
+        yield "{"
+        for i, (k, v) in enumerate(value.items()):
+            yield ("," if i else "") + dumps(str(k)) + ":"
+            yield from _walk_json(v, dumps)
+        yield "}"
+    elif isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+        yield dumps(value)
+    else:
+        yield "["
+        items = iter(value)
+        first = True
+        while batch := list(islice(items, JSON_STREAM_ITEMS)):
+            if any(isinstance(it, dict) and any(map(_is_lazy, it.values())) for it in batch):
+                # e.g. the host block holding the lazy findings: walk it
+                for it in batch:
+                    yield "" if first else ","
+                    yield from _walk_json(it, dumps)
+                    first = False
+                continue
+            # drop the batch's own brackets; batches are comma-joined
+            yield ("" if first else ",") + dumps(batch)[1:-1]
+            first = False
+        yield "]"
 
 
 class ScanDownloadView(AuthenticatedView):
@@ -370,9 +551,14 @@ class ScanDownloadView(AuthenticatedView):
         raw = fmt or request.GET.get("format") or request.GET.get("as") or "pdf"
         fmt = str(raw).strip().lower()
 
-        # 1) Fetch scan & check ownership
+        # 1) Fetch scan & check ownership (result joined; its raw_output
+        #    JSONB blob is never rendered, so it is left unread)
         try:
-            scan = Scan.objects.get(id=scan_id, user=request.user)
+            scan = (
+                Scan.objects.select_related("result")
+                .defer("result__raw_output")
+                .get(id=scan_id, user=request.user)
+            )
         except Scan.DoesNotExist:
             return JsonResponse({"detail": "Scan not found."}, status=404)
 
@@ -382,135 +568,111 @@ class ScanDownloadView(AuthenticatedView):
                 status=409,
             )
 
-        # 2) Pull related data (safe defaults)
-        try:
-            result: ScanResult = scan.result
-        except ScanResult.DoesNotExist:
-            result = None
-
-        vulns_qs = (
-            scan.vulnerabilities.all().order_by(
-                djm.Case(
-                    djm.When(severity="critical", then=djm.Value(0)),
-                    djm.When(severity="high",    then=djm.Value(1)),
-                    djm.When(severity="medium",  then=djm.Value(2)),
-                    djm.When(severity="low",     then=djm.Value(3)),
-                    djm.When(severity="info",    then=djm.Value(4)),
-                    default=djm.Value(5),
-                    output_field=djm.IntegerField(),
-                ),
-                "name",
-            )
+        # 2) Large PDF reports are rendered by a Celery task and stored;
+        #    the client polls this URL (202) until the file is ready
+        if fmt not in ("json", "html"):
+            pdf_name = report_pdf_name(scan)
+            if report_storage.exists(pdf_name):
+                return FileResponse(
+                    report_storage.open(pdf_name, "rb"),
+                    as_attachment=True,
+                    filename=f"scan_report_{scan_id}.pdf",
+                    content_type="application/pdf",
+                )
+            if scan.total_vulns > REPORT_SYNC_MAX_VULNS:
+                pending_key = report_pdf_pending_cache_key(scan.id)
+                pending = cache.get(pending_key)
+                if pending == REPORT_PDF_FAILED:
+                    return JsonResponse(
+                        {"detail": "Report rendering failed. Please try again later."},
+                        status=500,
+                    )
+                if pending is None:
+                    # marked before queuing so a fast task's own marker isn't
+                    # overwritten; dropped again if the broker rejects the task
+                    cache.set(pending_key, REPORT_PDF_PENDING, ttl=REPORT_PDF_PENDING_TTL)
+                    try:
+                        render_report_pdf_task.delay(scan.id, request.build_absolute_uri("/"))
+                    except Exception:
+                        cache.delete(pending_key)
+                        raise
+                return JsonResponse(
+                    {"status": "pending", "pollUrl": request.build_absolute_uri()},
+                    status=202,
+                )
+
+        # 3) HTML/JSON reports already rendered for this run of the scan.
+        #    Only reports up to REPORT_SYNC_MAX_VULNS findings are cached,
+        #    which bounds the size of each cache entry.
+        cacheable = fmt in ("json", "html") and scan.total_vulns <= REPORT_SYNC_MAX_VULNS
+        if cacheable:
+            cache_key = report_cache_key(scan, fmt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if fmt == "json":
+                    return HttpResponse(cached, content_type="application/json")
+                return HttpResponse(cached)
+
+        # 4) Gather report data. A streamed (uncached) JSON report reads the
+        #    findings lazily while encoding, so they're never all in memory.
+        context = build_report_context(
+            scan, user_display_name(request.user),
+            lazy_vulns=(fmt == "json" and not cacheable),
         )
 
-        # 3) Build hosts structure compatible with template
-        hosts: list[dict] = []
-        if result:
-            host_block = {
-                "ip": scan.target,
-                "reachable": bool(getattr(result, "open_ports", None)),
-                "ports": getattr(result, "open_ports", []) or [],
-                "http": getattr(result, "http_info", None),
-                "tls": getattr(result, "tls_info", None),
-                "vulnMatches": [],  # filled below
-            }
-            hosts.append(host_block)
-
-        # 4) Convert Vulnerability queryset to list for both host-level and report table
-        vulns: list[dict] = []
-        for v in vulns_qs:
-            vulns.append(
-                {
-                    "severity": (v.severity or "info"),
-                    "name": v.name,
-                    "host": scan.target,
-                    "path": v.path or "",
-                    "description": v.description or "",
-                    "remediation": v.remediation or "",
-                    "references": v.reference_links or [],
-                }
-            )
-        if hosts:
-            hosts[0]["vulnMatches"] = vulns
-
-        # 5) Aggregates
-        sev = _sev_summary(vulns)  # -> {critical,high,medium,low,info,total}
-        duration = _dur_str(scan.started_at, scan.finished_at)
-
-        open_ports_total = 0
-        if result and isinstance(result.open_ports, (list, tuple)):
-            open_ports_total = sum(
-                1 for p in result.open_ports if (p or {}).get("state") == "open"
-            )
-
-        # widths for the severity bar in template
-        total_for_bar = max(1, sev.get("total", 0))
-        widths = {
-            "critical": round(100 * sev.get("critical", 0) / total_for_bar, 2),
-            "high":     round(100 * sev.get("high", 0) / total_for_bar, 2),
-            "medium":   round(100 * sev.get("medium", 0) / total_for_bar, 2),
-            "low":      round(100 * sev.get("low", 0) / total_for_bar, 2),
-            "info":     round(100 * sev.get("info", 0) / total_for_bar, 2),
-        }
-
-        context = {
-            "app_name": "VulnScanner",
-            "logo_text": "VulnScanner",
-            "generated_at": timezone.now(),
-            "user_name": f"{getattr(request.user, 'first_name', 'User')} {getattr(request.user, 'last_name', '')}".strip(),
-            "scan": {
-                "target": scan.target,
-                "type": scan.mode,
-                "status": scan.status,
-                "createdAt": scan.created_at.isoformat(),
-                "finishedAt": scan.finished_at.isoformat() if scan.finished_at else "",
-                "results": {"summary": {"hostsScanned": 1}, "hosts": hosts},
-            },
-            "hosts": hosts,
-            "vulns": vulns,
-            "sev": sev,
-            "widths": widths,
-            "duration": duration,
-            "open_ports_total": open_ports_total,
-        }
-
-        # 6) Output formats
+        # 5) Output formats
         if fmt == "json":
-            return JsonResponse(context, status=200, safe=False)
+            if cacheable:
+                body = "".join(_json_chunks(context))
+                cache.set(cache_key, body, ttl=REPORT_CACHE_TTL)
+                return HttpResponse(body, content_type="application/json")
+            # Large reports are streamed as encoded and not cached
+            return StreamingHttpResponse(
+                _buffered(_json_chunks(context)),
+                content_type="application/json",
+            )
 
-        html = render_to_string("reports/scan_report.html", context)
+        html = render_report_html(context)
 
         if fmt == "html":
+            if cacheable:
+                cache.set(cache_key, html, ttl=REPORT_CACHE_TTL)
             return HttpResponse(html)
 
-        # default: PDF
-        pdf = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
+        # default: PDF, stored so later downloads are served from the file
+        pdf = render_report_pdf(html, request.build_absolute_uri("/"))
+        store_report_pdf(scan, pdf)
         resp = HttpResponse(pdf, content_type="application/pdf")
         resp["Content-Disposition"] = f'attachment; filename="scan_report_{scan_id}.pdf"'
         return resp
     
 
+# Per-user statistics change only when one of the user's scans completes
+# (run_scan_task drops the entry then); the TTL bounds staleness otherwise.
+MOST_COMMON_VULNS_TTL = 300
+
+
 @api_view(['GET'])
-@authentication_classes([CookieJWTAuthentication])
-@permission_classes([IsAuthenticated])
+@authentication_classes([JWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
 def most_common_vulns(request):
     """
     Retrieve statistics on most frequently found vulnerabilities.
     
     Analyzes user's scan history to identify common vulnerability patterns
-    and provide insights for security prioritization.
+    and provide insights for security prioritization. The aggregate is
+    computed in SQL and cached per user.
     """
-    user = request.user
-
-    vulns = Vulnerability.objects.filter(scan__user=user)
-
-    if not vulns.exists():
-        return Response({"most_common": []}, status=200)
-
-    vuln_names = [v.name for v in vulns]
-    freq = Counter(vuln_names)
-
-    result = [{"name": name, "count": count} for name, count in freq.most_common()]
+    key = most_common_vulns_cache_key(request.user.id)
+    result = cache.get_json(key)
+    if result is None:
+        result = list(
+            Vulnerability.objects.filter(scan__user=request.user)
+            .values("name")
+            .annotate(count=djm.Count("id"))
+            .order_by("-count", "name")
+        )
+        cache.set_json(key, result, ttl=MOST_COMMON_VULNS_TTL)
 
     return Response({"most_common": result}, status=200)
 
@@ -6,6 +6,7 @@
 "use client"
 
 import { useState, useEffect } from "react"
+import { downloadReportWithPolling } from "../utils/reportDownload"
 
 export default function History() {
   // -------------------------------
@@ -52,10 +53,9 @@ export default function History() {
   const handleDownload = async (scanId, format = "pdf") => {
     try {
       const numericScanId = scanId.replace("s_", "") // Remove 's_' prefix
-      const res = await fetch(`${API_BASE_URL}/scans/${numericScanId}/download`, {
-        method: "GET",
-        credentials: "include",
-      })
+      const downloadUrl = `${API_BASE_URL}/scans/${numericScanId}/download`
+      // Large PDF reports are rendered in the background: poll until ready
+      const res = await downloadReportWithPolling(downloadUrl)
 
       if (!res.ok) {
         const errorData = await res.json()
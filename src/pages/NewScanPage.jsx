@@ -2,6 +2,7 @@
 
 import { useState, useEffect, useRef } from "react"
 import { useNavigate } from "react-router-dom"
+import { downloadReportWithPolling } from "../utils/reportDownload"
 
 export default function NewScanPage() {
   // -------------------------------
@@ -233,10 +234,9 @@ export default function NewScanPage() {
   const handleDownloadReport = async (scanId, format = "pdf") => {
     try {
       const numericScanId = scanId.replace('s_', '')
-      const res = await fetch(`${API_BASE_URL}/scans/${numericScanId}/download?format=${format}`, {
-        method: "GET",
-        credentials: "include",
-      })
+      const downloadUrl = `${API_BASE_URL}/scans/${numericScanId}/download?format=${format}`
+      // Large PDF reports are rendered in the background: poll until ready
+      const res = await downloadReportWithPolling(downloadUrl)
 
       if (!res.ok) {
         const errorData = await res.json()
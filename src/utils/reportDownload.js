@@ -0,0 +1,23 @@
+// ----------------------------------------
+// Report download helper
+// Shared by the History and New Scan pages
+// ----------------------------------------
+
+// Polling of background-rendered PDF reports (HTTP 202 while pending)
+const REPORT_POLL_INTERVAL_MS = 2000
+const REPORT_POLL_MAX_ATTEMPTS = 150
+
+// Fetch a report download URL, polling while the server answers 202 and
+// giving up after REPORT_POLL_MAX_ATTEMPTS (~5 minutes). Resolves to the
+// final (non-202) response.
+export async function downloadReportWithPolling(downloadUrl) {
+  let res = await fetch(downloadUrl, { method: "GET", credentials: "include" })
+  for (let attempt = 0; res.status === 202; attempt++) {
+    if (attempt >= REPORT_POLL_MAX_ATTEMPTS) {
+      throw new Error("Report is taking too long to generate. Please try again later.")
+    }
+    await new Promise((resolve) => setTimeout(resolve, REPORT_POLL_INTERVAL_MS))
+    res = await fetch(downloadUrl, { method: "GET", credentials: "include" })
+  }
+  return res
+}
@@ -0,0 +1,48 @@
+"""
+Shared Redis client for the project's apps (cache, token revocation).
+
+Redis is optional: get_client() returns None when the redis package or a
+redis:// URL is missing, and callers fall back to process-local state.
+"""
+
+import os
+from typing import Optional
+
+try:
+    import redis  # optional; we already depend on it for Celery
+except Exception:  # pragma: no cover
+    redis = None
+
+_redis_client = None
+
+
+def _pick_redis_url() -> Optional[str]:
+    """
+    Prefer REDIS_URL. If not set, try Celery's result backend, then broker.
+    Return None if nothing suitable.
+    """
+    url = (
+        os.getenv("REDIS_URL")
+        or os.getenv("CELERY_RESULT_BACKEND")
+        or os.getenv("CELERY_BROKER_URL")
+    )
+    if url and url.startswith("redis://"):
+        return url
+    return None
+
+
+def get_client():
+    """
+    Create a singleton Redis client when possible; otherwise return None
+    to indicate using the in-memory fallback.
+    """
+    global _redis_client
+    if _redis_client is not None:
+        return _redis_client
+
+    url = _pick_redis_url()
+    if redis and url:
+        _redis_client = redis.Redis.from_url(url, decode_responses=True)
+    else:
+        _redis_client = None
+    return _redis_client
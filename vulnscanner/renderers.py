@@ -0,0 +1,39 @@
+"""
+JSON renderer for VulnScan API responses.
+
+Encodes response data with orjson when it is installed, falling back to
+DRF's stock JSONRenderer otherwise. Output matches the stock renderer:
+compact UTF-8 JSON, with dates, times and datetimes, and types orjson
+doesn't handle natively (Decimal, lazy strings, ...), formatted by DRF's
+own encoder rather than orjson's.
+"""
+
+try:
+    import orjson  # optional; ~3-5x faster than the stdlib json module
+except Exception:  # pragma: no cover
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that serializes with orjson when available.
+
+    Indented output (requested via the Accept header's `indent` parameter)
+    and environments without orjson use the parent implementation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_fallback_encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
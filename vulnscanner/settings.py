@@ -57,6 +57,8 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),  # Database password from environment
         "HOST": os.getenv("DB_HOST"),          # Database host from environment
         "PORT": os.getenv("DB_PORT", "5432"),  # Database port (default: 5432)
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),  # Reuse connections across requests (seconds)
+        "CONN_HEALTH_CHECKS": True,            # Re-check reused connections before each request
         "OPTIONS": {
             "sslmode": os.getenv("DB_SSLMODE", "require"),  # SSL requirement for secure connection
         },
@@ -154,6 +156,18 @@ TEMPLATES = [
 # WSGI application for deployment
 WSGI_APPLICATION = 'vulnscanner.wsgi.application'
 
+# =============================================================================
+# REST FRAMEWORK CONFIGURATION
+# =============================================================================
+
+# JSON-only API: no BrowsableAPIRenderer form introspection on each response,
+# and encoding via orjson when installed (see vulnscanner/renderers.py)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "vulnscanner.renderers.ORJSONRenderer",
+    ],
+}
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================
@@ -174,6 +188,16 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: new and re-hashed passwords use bcrypt (SHA-256
+# pre-hashed, Django's default cost of 12 rounds, roughly 250ms per check).
+# The PBKDF2 hashers stay listed so existing hashes still verify; Django's
+# ModelBackend re-hashes them with bcrypt on the user's next successful login.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 # =============================================================================
 # INTERNATIONALIZATION
 # =============================================================================
@@ -205,6 +229,7 @@ CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:63
 # Task routing configuration - specific queues for different task types
 CELERY_TASK_ROUTES = {
     "apps.scans_app.tasks.run_scan_task": {"queue": "scans"},  # Route scan tasks to 'scans' queue
+    "apps.scans_app.tasks.render_report_pdf_task": {"queue": "scans"},  # Large PDF reports, same workers
 }
 
 # Task execution limits for resource management
@@ -223,3 +248,7 @@ CELERY_RESULT_SERIALIZER = "json"     # Serialize results as JSON
 # Media files configuration for user uploads (avatars, reports, etc.)
 MEDIA_URL = "/media/"                 # URL prefix for media files
 MEDIA_ROOT = BASE_DIR / "media"       # Filesystem path for media storage
+
+# Rendered scan reports. Deliberately outside MEDIA_ROOT: /media/ is served
+# without authentication, so reports are only readable via ScanDownloadView
+REPORTS_ROOT = Path(os.getenv("REPORTS_ROOT", BASE_DIR / "private" / "reports"))
@@ -1,4 +1,3 @@
-```python
 """
 URL configuration for VulnScan vulnerability scanner project.
 
@@ -100,4 +99,3 @@ Security Considerations:
 - Media files are validated before serving
 - CORS is configured for frontend communication
 """
-```